@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+import asyncio
+import collections
+import socket
+import numpy as np
+from surrender.qvariant import QVariantHashParser
+from surrender.surrender_client_base import surrender_client_base
+
+
+# Command waiting for its reply
+class _PendingCommand:
+    __slots__ = ('command_id', 'future', 'error', 'file_reqs')
+
+    def __init__(self, command_id, future):
+        self.command_id = command_id
+        self.future = future
+        self.error = None
+        self.file_reqs = []
+
+
+class async_surrender_client_base(surrender_client_base):
+    """
+    | asyncio counterpart of surrender_client_base, built on asyncio streams: every command is a coroutine.
+    | Commands are written as soon as they are called and a background task reads the replies, decoding them
+    | while they arrive (see surrender.qvariant.QVariantHashParser), so one event loop can keep several servers busy:
+    |     await asyncio.gather(client1.render(), client2.render())
+    | A command returns (or raises the server error reported for it) once its reply has been received.
+    | Compressed images are decompressed in a worker thread, without blocking the event loop.
+    | The commands of async_surrender_client are generated from surrender_client by tools/generate_async_client.py.
+    """
+    def __init__(self):
+        super().__init__()
+        # Incoming data is pushed into the parser by the reader task
+        self._decoder = QVariantHashParser()
+        self._read_size = 1 << 20
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._pending = collections.deque()
+        self._timeout = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def connectToServer(self, hostname, port = 5151):
+        """
+        Connect to a Surrender server. First parameter is the hostname, second parameter the TCP port.
+        """
+        if self._writer is not None:
+            self._connection_lost(RuntimeError('Connection closed'))
+        self._encoder.reset()
+        self._decoder.reset()
+
+        try:
+            self._reader, self._writer = await asyncio.open_connection(hostname, port)
+        except Exception as e:
+            msg = "error connecting to " + hostname + " : " + str(e) + "\n"
+            self._printError(msg)
+            self._reader = self._writer = None
+            if self._exception_on_error:
+                raise RuntimeError(msg)
+            return
+
+        sock = self._writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._read_task = asyncio.ensure_future(self._read_loop(self._reader))
+
+    async def close(self):
+        """
+        Close the connection to the server. Commands still waiting for their reply raise a RuntimeError.
+        """
+        writer = self._writer
+        if writer is None:
+            return
+        try:
+            self.writeQVariantHash({ "" : "close" })
+            await writer.drain()
+        except (ConnectionError, RuntimeError):
+            pass
+        self._connection_lost(RuntimeError('Connection closed'))
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    def isConnected(self):
+        """
+        Returns True if connected to a server, False otherwise.
+        """
+        return self._writer is not None
+
+    def setAsync(self, enable):
+        """
+        Not available: commands of the asyncio client always wait for their reply, run them concurrently with asyncio instead.
+        """
+        raise RuntimeError("async_surrender_client commands always wait for their reply")
+
+    def setFramePool(self, pool):
+        """
+        Not available: images of the asyncio client are decoded in worker threads, pass 'out' to the getters instead.
+        """
+        raise RuntimeError("async_surrender_client doesn't support frame pools")
+
+    def batch(self):
+        """
+        Not available: commands of the asyncio client are written as soon as they are called, gather them instead.
+        """
+        raise RuntimeError("async_surrender_client doesn't support batches")
+
+    def checkErrors(self):
+        """
+        Not available: errors of the asyncio client are raised by the commands they are reported for.
+        """
+        raise RuntimeError("async_surrender_client commands raise their own errors")
+
+    def renderFrames(self, schedule, setup, outputs = ("getImage",), depth = 2):
+        """
+        Not available: run render() and the getters of successive frames concurrently with asyncio instead.
+        """
+        raise RuntimeError("renderFrames is not available in async_surrender_client")
+
+    def getFrame(self, outputs = ("getImage", "getDepthMap", "getNormalMap", "getLOSMap", "getTimeMap")):
+        """
+        Not available: await asyncio.gather() on the getters instead, their replies are read in one pass.
+        """
+        raise RuntimeError("getFrame is not available in async_surrender_client")
+
+    def renderROI(self, roi, output = "getImage"):
+        """
+        Not available in the asyncio client.
+        """
+        raise RuntimeError("renderROI is not available in async_surrender_client")
+
+    async def sync(self):
+        """
+        Wait until all the commands sent so far have received their reply (their errors are raised by the commands themselves).
+        """
+        if self._pending:
+            await asyncio.wait([cmd.future for cmd in self._pending])
+
+    def setTimeOut(self, timeout):
+        """
+        Sets the timeout in seconds to wait for server responses (None waits forever).
+        """
+        self._check_connection()
+        self._timeout = timeout
+
+    async def getImage(self, out = None):
+        """
+        Return the last generated image with its 4 channels in float (see surrender_client_base.getImage).
+        """
+        ret = await self._call({ "" : "getImage" })
+        return await self._image_result(ret, "getImage", out)
+
+    async def getImageRGBA8(self, out = None):
+        """
+        Return the last generated image with its 4 channels in 8bits.
+        """
+        ret = await self._call({ "" : "getImageRGBA8" })
+        return await self._image_result(ret, "getImageRGBA8", out)
+
+    async def getDepthMap(self, out = None):
+        """
+        Return the depth map of the last rendererd image in double precision.
+        """
+        ret = await self._call({ "" : "getDepthMap" })
+        return await self._image_result(ret, "getDepthMap", out)
+
+    async def getNormalMap(self, out = None):
+        """
+        Return the normal map of the last rendererd image in single precision.
+        """
+        ret = await self._call({ "" : "getNormalMap" })
+        return await self._image_result(ret, "getNormalMap", out)
+
+    async def getLOSMap(self, out = None):
+        """
+        Returns the LOS map of the last raytraced image in single precision.
+        """
+        ret = await self._call({ "" : "getLOSMap" })
+        return await self._image_result(ret, "getLOSMap", out)
+
+    async def getTimeMap(self, out = None):
+        """
+        Returns the time map of the last raytraced image in single precision.
+        """
+        ret = await self._call({ "" : "getTimeMap" })
+        return await self._image_result(ret, "getTimeMap", out)
+
+    async def getImageGray32F(self, out = None):
+        """
+        Return the last generated image as a single channel (the mean of the first 3 channels, usually RGB) in float.
+        """
+        ret = await self._call({ "" : "getImageGray32F" })
+        return await self._image_result(ret, "getImageGray32F", out)
+
+    async def getImageGray8(self, out = None):
+        """
+        Return the last generated image as a single channel (the mean of the first 3 channels, usually RGB) in 8bits.
+        """
+        ret = await self._call({ "" : "getImageGray8" })
+        return await self._image_result(ret, "getImageGray8", out)
+
+    async def getImageSpectrumProjection(self, spectrum, out = None):
+        """
+        Return the projection of the pixels of the last generated image along the given spectrum vector.
+        """
+        ret = await self._call({ "" : "getImageSpectrumProjection",
+                                 "spectrum" : self._vec(spectrum) })
+        return await self._image_result(ret, "getImageSpectrumProjection", out)
+
+    async def closeViewer(self):
+        """
+        Close the viewer window on the server side.
+        """
+        await self._call({ "" : "closeViewer" })
+
+    async def setCompressionLevel(self, lvl):
+        """
+        Set the compression level for image transfer. Ranges from 0 to 9, 0 means no compression and 9 means maximum compression.
+        """
+        await self._call({ "compression_level" : int(lvl),
+                           "" : "setCompressionLevel" })
+
+    async def runLuaCode(self, code):
+        """
+        Run the given Lua code on the server. The Lua VM is preserved across calls so you can store values in the VM global environment.
+        """
+        ret = await self._call({ "" : "runLUACode",
+                                 "code" : str(code) })
+        return ret.get("return")
+
+    async def runLuaScript(self, filename):
+        """
+        Run a Lua script (which should be on the server) in the Lua VM of the server.
+        """
+        ret = await self._call({ "" : "runLUAScript",
+                                 "filename" : str(filename) })
+        return ret.get("return")
+
+    async def updateUserDataTexture(self, name, data, compressionLevel):
+        """
+        Send texture data to replace the content of a dynamic user texture (see surrender_client_base.updateUserDataTexture).
+        """
+        self._check_connection()
+        await self._call(self._user_data_texture_params(name, data, compressionLevel))
+
+    async def setPSF(self, psf_image, support_w = -1, support_h = -1, blooming_threshold_distance = 0):
+        """
+        Set the PSF as a 2D matrix of weights with its support (or size) in pixels and a distance in samples above which samples are considered part of the tail.
+        """
+        self._check_connection()
+        await self._call(self._psf_params(psf_image, support_w, support_h, blooming_threshold_distance))
+
+    async def setPSFWithTail(self, psf_image, psf_tail_image, PSF_tail_coef, support_w = -1, support_h = -1, support_w_tail = -1, support_h_tail = -1):
+        """
+        Same as setPSF but allows using a different sampling for the PSF tail.
+        """
+        self._check_connection()
+        await self._call(self._psf_with_tail_params(psf_image, psf_tail_image, PSF_tail_coef, support_w, support_h, support_w_tail, support_h_tail))
+
+    async def getPSF(self):
+        """
+        Return a 2D matrix of weights correponding to the active PSF.
+        """
+        ret = await self._call({ "" : "getPSF" })
+        return np.frombuffer(ret["psf"], dtype=np.float32).reshape(ret["height"], ret["width"])
+
+    async def sendFile(self, filename, data, compressionLevel = -1, offset = 0, append = False):
+        """
+        Send a file to the server (see surrender_client_base.sendFile).
+        """
+        self._check_connection()
+        await self._call(self._send_file_params(filename, data, compressionLevel, offset, append))
+
+    async def syncDir(self, dirname, compressionLevel = -1):
+        """
+        Synchronize a folder with the active resource folder on the server (see surrender_client_base.syncDir).
+        """
+        self._check_connection()
+        params = await asyncio.get_running_loop().run_in_executor(None, self._sync_dir_params, dirname, compressionLevel)
+        await self._call(params)
+
+    async def syncFile(self, fname, server_fname = None, compressionLevel = -1):
+        """
+        Synchronize a server file with a local file (see surrender_client_base.syncFile).
+        """
+        self._check_connection()
+        params = await asyncio.get_running_loop().run_in_executor(None, self._sync_file_params, fname, server_fname, compressionLevel)
+        await self._call(params)
+
+    async def sendImageTo(self, target, port, format, depth, channels, texture_name = ""):
+        """
+        Send an image over another TCP/IP link (see surrender_client_base.sendImageTo).
+        """
+        self._check_connection()
+        self.writeQVariantHash({
+            "target_name" : str(target),
+            "format" : str(format),
+            "port" : int(port),
+            "depth" : int(depth),
+            "channels" : int(channels),
+            "texture_name" : str(texture_name),
+            "" : "sendImageTo"
+            })
+        await self._writer.drain()
+
+    # Serializes a dictionnary as a QHash<QString, QVariant> and writes it without waiting for any reply
+    def writeQVariantHash(self, table):
+        self._check_connection()
+        self._encoder.writeQVariantHash(table)
+        self._writer.write(self._encoder.takeData())
+
+    # Replies are read by the reader task: they are only available as results of the commands
+    def readQVariantHash(self, numpy_lists = None):
+        raise RuntimeError("async_surrender_client_base reads replies in the background, commands return them")
+
+    # Payloads are delivered by the parser as bytes, it can't receive them in place or through a PayloadInflater
+    def _set_payload_buffer(self, key, into = None, out = None):
+        pass
+
+    # Send a command and wait for its reply
+    async def _call(self, params):
+        self._check_connection()
+        while len(self._pending) >= self._max_pending:
+            await asyncio.wait([self._pending[0].future])
+            self._check_connection()
+        cmd = _PendingCommand(params[""], asyncio.get_running_loop().create_future())
+        self.writeQVariantHash(params)
+        # Replies come in the order of the commands
+        self._pending.append(cmd)
+        await self._writer.drain()
+        if self._timeout is None:
+            ret = await cmd.future
+        else:
+            ret = await asyncio.wait_for(cmd.future, self._timeout)
+
+        for args in self._file_chunks(cmd.file_reqs):
+            await self.sendFile(*args)
+        return ret
+
+    # Decode an image reply, compressed data is processed in a worker thread (zlib releases the GIL)
+    async def _image_result(self, ret, COMMAND_ID, out = None):
+        if not ret.get("compressed"):
+            return self._image_from_return(ret, COMMAND_ID, out)
+        return await asyncio.get_running_loop().run_in_executor(None, self._image_from_return, ret, COMMAND_ID, out)
+
+    # Reader task: feed the parser and dispatch the messages until the connection is closed
+    async def _read_loop(self, reader):
+        error = RuntimeError('Socket error')
+        try:
+            while True:
+                data = await reader.read(self._read_size)
+                if not data:
+                    break
+                for ret in self._decoder.feed(data):
+                    self._dispatch(ret)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            error = e
+        if self._reader is reader:
+            self._connection_lost(error)
+
+    def _dispatch(self, ret):
+        cmd = self._pending[0] if self._pending else None
+        # Check if file resend requests are pending
+        if ret.get("files2update") != None and cmd is not None:
+            cmd.file_reqs = ret.get("files2update")
+
+        command_id = ret.get("")
+        if command_id == None or command_id == "":
+            try:
+                self._log_message(ret)
+            except RuntimeError as e:
+                # Errors are raised by the command being processed
+                if cmd is not None and cmd.error is None:
+                    cmd.error = e
+            return
+
+        if cmd is None or command_id != cmd.command_id:
+            return
+        self._pending.popleft()
+        if cmd.future.done():
+            return
+        if cmd.error is not None:
+            cmd.future.set_exception(cmd.error)
+        else:
+            cmd.future.set_result(ret)
+
+    # Forget the connection, commands waiting for their reply raise 'error'
+    def _connection_lost(self, error):
+        writer = self._writer
+        self._reader = self._writer = None
+        if self._read_task is not None and self._read_task is not asyncio.current_task():
+            self._read_task.cancel()
+        self._read_task = None
+        if writer is not None:
+            writer.close()
+        while self._pending:
+            cmd = self._pending.popleft()
+            if not cmd.future.done():
+                cmd.future.set_exception(error)
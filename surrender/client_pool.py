@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+import collections
+import threading
+
+
+class ClientPool:
+    """
+    | Connections to several SurRender servers (several nodes, or several instances on one host) used as one renderer.
+    |     pool = ClientPool(["node1", "node2", ("node3", 5152)])
+    |     pool.run(setup_scene)                      # setup_scene(client) is called on every server
+    |     for item, images in pool.renderFrames(schedule, setup_frame):
+    |         ...
+    | Each connection is driven by its own thread: frames are dispatched to whichever server is idle and
+    | the results are yielded in the order of the schedule.
+    """
+    def __init__(self, servers, client_factory = None):
+        """
+        | servers is a list of hostnames or (hostname, port) tuples.
+        | client_factory creates the clients, surrender_client by default.
+        """
+        if client_factory is None:
+            from surrender.surrender_client import surrender_client
+            client_factory = surrender_client
+        self.clients = []
+        for server in servers:
+            hostname, port = (server, 5151) if isinstance(server, str) else server
+            client = client_factory()
+            client.connectToServer(hostname, port)
+            self.clients.append(client)
+
+    def __len__(self):
+        return len(self.clients)
+
+    def run(self, fn, *args):
+        """
+        | Call fn(client, *args) on all the clients concurrently and wait for their acknowledgements (see surrender_client.sync).
+        | Returns the list of the values returned by fn, raises the first exception raised on a client.
+        """
+        return self.map(lambda client, item: fn(client, *args), [None] * len(self.clients))
+
+    def map(self, fn, items):
+        """
+        | Call fn(clients[k], items[k]) concurrently for each item (there must not be more items than clients)
+        | and wait for the acknowledgements of the clients used.
+        | Returns the list of the values returned by fn, raises the first exception raised on a client.
+        """
+        items = list(items)
+        if len(items) > len(self.clients):
+            raise ValueError("{} items for {} clients".format(len(items), len(self.clients)))
+        results = [None] * len(items)
+        errors = [None] * len(items)
+
+        def call(k, client):
+            try:
+                results[k] = fn(client, items[k])
+                client.sync()
+            except BaseException as e:
+                errors[k] = e
+
+        threads = [threading.Thread(target=call, args=(k, self.clients[k])) for k in range(len(items))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for e in errors:
+            if e is not None:
+                raise e
+        return results
+
+    def broadcast(self, command, *args, **kwargs):
+        """
+        | Call the command named 'command' with the given arguments on all the clients (see run).
+        |     pool.broadcast("setObjectPosition", "earth", pos)
+        """
+        return self.run(lambda client: getattr(client, command)(*args, **kwargs))
+
+    def renderFrames(self, schedule, setup, outputs = ("getImage",), depth = 2, max_ahead = None):
+        """
+        | Same as surrender_client.renderFrames, with the frames spread over the servers of the pool:
+        | each server renders the next frame of the schedule as soon as it is idle (with 'depth' frames in flight).
+        | setup(client, item) is called with the client the frame is sent to, it must set the whole state of the frame.
+        | max_ahead bounds the number of frames rendered ahead of the next frame to yield (4 per server by default).
+        """
+        if max_ahead is None:
+            max_ahead = 4 * len(self.clients)
+        dispatch = _Dispatch(iter(schedule), max(max_ahead, 1))
+        threads = [threading.Thread(target=dispatch.work, args=(client, setup, outputs, depth), daemon=True)
+                   for client in self.clients]
+        for t in threads:
+            t.start()
+        try:
+            while True:
+                frame = dispatch.get(len(threads))
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            dispatch.close()
+            for t in threads:
+                t.join()
+
+
+# Shared state of the worker threads of ClientPool.renderFrames
+class _Dispatch:
+    def __init__(self, items, max_ahead):
+        self._items = items
+        self._max_ahead = max_ahead
+        self._cond = threading.Condition()
+        self._taken = 0
+        self._next = 0
+        self._results = {}
+        self._exhausted = False
+        self._closed = False
+        self._error = None
+        self._finished = 0
+
+    # Return the next (index, item) of the schedule, None if there is none available (or left)
+    def take(self, block):
+        with self._cond:
+            while True:
+                if self._closed or self._exhausted or self._error is not None:
+                    return None
+                if self._taken - self._next < self._max_ahead:
+                    try:
+                        item = next(self._items)
+                    except StopIteration:
+                        self._exhausted = True
+                        self._cond.notify_all()
+                        return None
+                    self._taken += 1
+                    return (self._taken - 1, item)
+                if not block:
+                    return None
+                self._cond.wait()
+
+    def put(self, index, frame):
+        with self._cond:
+            self._results[index] = frame
+            self._cond.notify_all()
+
+    # Next frame in order, None once all the frames have been returned
+    def get(self, nb_workers):
+        with self._cond:
+            while True:
+                if self._next in self._results:
+                    frame = self._results.pop(self._next)
+                    self._next += 1
+                    self._cond.notify_all()
+                    return frame
+                if self._error is not None:
+                    raise self._error
+                if self._finished == nb_workers:
+                    return None
+                self._cond.wait()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # Worker thread: keep 'depth' frames in flight on 'client', reading the oldest one when no new frame can be sent
+    def work(self, client, setup, outputs, depth):
+        frames = collections.deque()
+        try:
+            while True:
+                entry = self.take(block = not frames)
+                if entry is not None:
+                    index, item = entry
+                    frames.append((index, client._send_frame(item, setup, outputs)))
+                    if len(frames) < depth:
+                        continue
+                if not frames:
+                    return
+                index, frame = frames.popleft()
+                self.put(index, client._frame_result(frame, outputs))
+        except BaseException as e:
+            with self._cond:
+                if self._error is None:
+                    self._error = e
+        finally:
+            with self._cond:
+                self._finished += 1
+                self._cond.notify_all()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+
+# Commands which only overwrite a state of the server, with the parameters identifying that state.
+# A command makes the previous one with the same key useless, commands sharing a key name overwrite the same state.
+_COLLAPSIBLE = {
+    "setObjectPosition" : ("setObjectPosition", "object_name"),
+    "setObjectAttitude" : ("setObjectAttitude", "object_name"),
+    "setObjectMotion" : ("setObjectMotion", "object_name"),
+    "setObjectSamples" : ("setObjectSamples", "object_name"),
+    "setObjectProperty" : ("setObjectProperty", "name", "property"),
+    "setObjectElementProperty" : ("setObjectElementProperty", "name", "element_name", "property"),
+    "setObjectElementBRDF" : ("setObjectElementBRDF", "object_name", "element_name"),
+    "setSunPower" : ("sunPower",),
+    "setSunPowerAtDistance" : ("sunPower",),
+    "setIntegrationTime" : ("setIntegrationTime",),
+    "setCameraFOVDeg" : ("cameraFOV",),
+    "setCameraFOVRad" : ("cameraFOV",),
+    "setMetadata" : ("setMetadata", "name"),
+}
+
+
+class CommandBatch:
+    """
+    | Commands recorded by surrender_client.batch(), sent together when the batch is committed.
+    | State updates are collapsed: an update overwriting the state set by a previous command of the batch
+    | (for instance two positions of the same object) replaces it, the futures of both commands are then
+    | acknowledged by the remaining one. Other commands are barriers: updates are never collapsed across them.
+    """
+    def __init__(self):
+        # [params, futures] in sending order, params is None for collapsed commands
+        self._entries = []
+        # Entry of the last update of each state since the last barrier
+        self._states = {}
+
+    def __len__(self):
+        return sum(1 for params, futures in self._entries if params is not None)
+
+    def writeQVariantHash(self, table):
+        entry = [table, []]
+        rule = _COLLAPSIBLE.get(table.get(""))
+        if rule is None:
+            self._states.clear()
+        else:
+            key = rule[:1] + tuple(str(table.get(name)) for name in rule[1:])
+            previous = self._states.get(key)
+            if previous is not None:
+                entry[1] = previous[1]
+                previous[0] = None
+                previous[1] = []
+            self._states[key] = entry
+        self._entries.append(entry)
+
+    # Future of the last recorded command
+    def attach(self, future):
+        self._entries[-1][1].append(future)
+
+    # Remove and return the recorded commands: list of (params, futures)
+    def take(self):
+        entries = [(params, futures) for params, futures in self._entries if params is not None]
+        self._entries = []
+        self._states.clear()
+        return entries
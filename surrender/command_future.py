@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+
+class CommandFuture:
+    """
+    | Acknowledgement of a command sent by surrender_client in asynchronous mode (the default).
+    | The command returns immediately, its acknowledgement is read later: when the future is queried,
+    | when the client needs the reply of another command or when too many commands are in flight.
+    | Errors reported by the server for the command are raised by result(), or by surrender_client.sync()
+    | if they were not retrieved from the future.
+    | Futures of requests (see surrender_client.renderFrames) also hold the decoded reply of the command.
+    """
+    __slots__ = ('command_id', '_client', '_done', '_error', '_observed', '_merged', '_decode', '_reply', '_value')
+
+    def __init__(self, client, command_id, decode = None):
+        self.command_id = command_id
+        self._client = client
+        self._done = False
+        self._error = None
+        self._observed = False
+        # Futures of commands collapsed into this one by a batch, acknowledged with it
+        self._merged = []
+        # Function decoding the reply of a request, called by result()
+        self._decode = decode
+        self._reply = None
+        self._value = None
+
+    def __repr__(self):
+        state = 'pending' if not self._done else ('failed' if self._error is not None else 'done')
+        return '<CommandFuture {} {}>'.format(self.command_id, state)
+
+    def done(self):
+        """
+        | Return True if the acknowledgement of the command has been received (without waiting for it).
+        """
+        return self._done
+
+    def wait(self):
+        """
+        | Wait for the acknowledgement of the command (and of the commands sent before it).
+        """
+        while not self._done:
+            self._client._read_ack()
+            if not self._done and self._client.getPendingCommandCount() == 0:
+                raise RuntimeError("{} was not sent".format(self.command_id))
+
+    def exception(self):
+        """
+        | Wait for the acknowledgement of the command and return the error reported by the server, None if it succeeded.
+        """
+        self.wait()
+        self._observed = True
+        return self._error
+
+    def result(self):
+        """
+        | Wait for the acknowledgement of the command, raise the error reported by the server if it failed.
+        | Return the result of a request, None for other commands.
+        """
+        error = self.exception()
+        if error is not None:
+            raise error
+        if self._decode is not None:
+            self._value = self._decode(self._reply)
+            self._decode = None
+            self._reply = None
+        return self._value
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+
+class Frame(dict):
+    """
+    | Outputs of a frame returned by surrender_client.getFrame (and yielded by renderFrames): a dict mapping the names
+    | of the getters to their results, also available as attributes (None when the output was not requested):
+    |     frame = client.getFrame(("getImage", "getDepthMap", "getNormalMap", "getLOSMap", "getTimeMap"))
+    |     frame.image, frame.depth_map, frame.normal_map, frame.los_map, frame.time_map
+    """
+    __slots__ = ()
+
+    @property
+    def image(self):
+        return self.get("getImage")
+
+    @property
+    def depth_map(self):
+        return self.get("getDepthMap")
+
+    @property
+    def normal_map(self):
+        return self.get("getNormalMap")
+
+    @property
+    def los_map(self):
+        return self.get("getLOSMap")
+
+    @property
+    def time_map(self):
+        return self.get("getTimeMap")
+
+    @property
+    def metadata(self):
+        return self.get("getMetadata")
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+import numpy as np
+import threading
+
+
+class FramePool:
+    """
+    | Preallocated output arrays reused by the image getters of surrender_client (getImage, getDepthMap, ...).
+    | Attach it with surrender_client.setFramePool: getters called without 'out' then write their result
+    | in an array of the pool, received in place when possible, instead of allocating a new array at each call.
+    |
+    | Each getter cycles through 'nb_slots' arrays: the array returned by a call is overwritten 'nb_slots' calls
+    | of the same getter later. Copy it if it has to live longer than that.
+    | A pool can be shared between threads and clients: a getter claims its slot (see reserve) before receiving
+    | the frame in it, concurrent getters never write in the same array as long as there are fewer of them than slots.
+    """
+    def __init__(self, nb_slots = 2):
+        if nb_slots < 1:
+            raise ValueError("a FramePool needs at least one slot")
+        self._nb_slots = int(nb_slots)
+        self._slots = {}
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, name):
+        """
+        | Claim the next slot of 'name': return its index and its current array (None if it has not been allocated yet),
+        | to be resized with fit() once the shape of the frame is known.
+        | A slot reserved by one thread is not handed out again before 'nb_slots' other reservations of 'name'.
+        """
+        with self._lock:
+            if name not in self._slots:
+                self._slots[name] = [None] * self._nb_slots
+                self._next[name] = 0
+            idx = self._next[name]
+            self._next[name] = (idx + 1) % self._nb_slots
+            return idx, self._slots[name][idx]
+
+    def fit(self, name, slot, shape, dtype):
+        """
+        | Return the array of the slot returned by reserve(name), reallocated only if it doesn't match 'shape' and 'dtype'.
+        """
+        dtype = np.dtype(dtype)
+        shape = tuple(shape)
+        with self._lock:
+            slots = self._slots.get(name)
+            if slots is None:
+                # The pool has been cleared since the reservation
+                return np.empty(shape, dtype=dtype)
+            a = slots[slot]
+            if a is None or a.shape != shape or a.dtype != dtype:
+                a = np.empty(shape, dtype=dtype)
+                slots[slot] = a
+            return a
+
+    def acquire(self, name, shape, dtype):
+        """
+        | Reserve the next slot of 'name' and return its array, reallocated only if it doesn't match 'shape' and 'dtype'.
+        """
+        slot, a = self.reserve(name)
+        return self.fit(name, slot, shape, dtype)
+
+    def clear(self):
+        """
+        | Release all the arrays of the pool.
+        """
+        with self._lock:
+            self._slots.clear()
+            self._next.clear()
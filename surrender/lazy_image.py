@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+import json
+import struct
+import zlib
+
+import numpy as np
+
+_MAGIC = b'SRLAZY01'
+
+
+class LazyImage:
+    """
+    | Image returned by the getters of surrender_client when lazy images are enabled (see surrender_client.setLazyImages).
+    | It keeps the payload as received from the server (possibly compressed, rows bottom to top) and only decodes it
+    | into a numpy array on first access: array(), np.asarray(image), image[...].
+    | save() writes the payload as is, without decompressing it, loadLazyImage() reads it back.
+    """
+    def __init__(self, payload, compressed, shape, dtype, byte_planes = False):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.compressed = bool(compressed)
+        self._payload = payload
+        self._byte_planes = bool(byte_planes)
+        self._array = None
+
+    def __repr__(self):
+        state = 'decoded' if self._array is not None else ('compressed' if self.compressed else 'raw')
+        return '<LazyImage {} {} {}>'.format(self.shape, self.dtype, state)
+
+    def __array__(self, dtype = None, copy = None):
+        a = self.array()
+        if dtype is not None and np.dtype(dtype) != a.dtype:
+            return a.astype(dtype)
+        return np.array(a) if copy else a
+
+    def __getitem__(self, index):
+        return self.array()[index]
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def decoded(self):
+        """
+        | Return True if the array has already been decoded.
+        """
+        return self._array is not None
+
+    def payload(self):
+        """
+        | Return the payload as sent by the server.
+        """
+        return self._payload
+
+    def array(self):
+        """
+        | Decode the payload (once) and return the image as a numpy array, rows top to bottom.
+        """
+        if self._array is None:
+            buf = self._payload
+            if self.compressed:
+                with memoryview(buf) as view:
+                    buf = zlib.decompress(view[4:], bufsize = struct.unpack_from('>I', view, 0)[0])
+                if self._byte_planes:
+                    # Bytes of the elements are sent plane by plane (see surrender_client.getImageSpectrumProjection)
+                    h, w = self.shape[:2]
+                    buf = np.frombuffer(buf, dtype=np.uint8).reshape(self.dtype.itemsize, h, w).transpose(1,2,0).tobytes()
+            self._array = np.flipud(np.frombuffer(buf, dtype=self.dtype).reshape(self.shape))
+            self._payload = None
+        return self._array
+
+    def save(self, file):
+        """
+        | Write the image to 'file' (a filename or a binary file object) in the format read by loadLazyImage.
+        | The payload is written as received, still compressed if it was, unless the image has already been decoded.
+        """
+        if self._array is not None:
+            header = { 'shape' : list(self.shape), 'dtype' : self.dtype.str, 'compressed' : False, 'byte_planes' : False }
+            payload = np.ascontiguousarray(np.flipud(self._array)).data
+        else:
+            header = { 'shape' : list(self.shape), 'dtype' : self.dtype.str, 'compressed' : self.compressed, 'byte_planes' : self._byte_planes }
+            payload = self._payload
+        header = json.dumps(header).encode('utf-8')
+        if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+            with open(file, 'wb') as f:
+                self._write(f, header, payload)
+        else:
+            self._write(file, header, payload)
+
+    def _write(self, f, header, payload):
+        f.write(_MAGIC + struct.pack('<I', len(header)) + header)
+        f.write(payload)
+
+
+def loadLazyImage(file):
+    """
+    | Read an image written by LazyImage.save from 'file' (a filename or a binary file object), return a LazyImage.
+    """
+    if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+        with open(file, 'rb') as f:
+            return loadLazyImage(f)
+    if file.read(len(_MAGIC)) != _MAGIC:
+        raise RuntimeError("not a LazyImage file")
+    size = struct.unpack('<I', file.read(4))[0]
+    header = json.loads(file.read(size).decode('utf-8'))
+    return LazyImage(file.read(), header['compressed'], header['shape'], header['dtype'], header['byte_planes'])
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+import threading
+import time
+
+import numpy as np
+
+# Columns of the µtasks returned by surrender_client.generateMicroTasks
+CLUSTER_ID = 0
+X = 1
+Y = 2
+SAMPLES = 3
+OBJECT_ID = 4
+START = 5
+END = 6
+WEIGHT = 7
+FLAGS = 8
+NB_COLUMNS = 9
+
+# Image getters whose values can be summed over disjoint sets of µtasks
+_ADDITIVE_OUTPUTS = ("getImage", "getImageGray32F")
+
+
+def generateMicroTasks(client):
+    """
+    | Generate the µtasks required to render the next image of 'client' as a (N, 9) float64 array (see the columns above).
+    """
+    # The reply is decoded as an array straight from the receive buffer (a list of lists would cost a Python object per value)
+    return np.asarray(client._generate_micro_tasks(), dtype=np.float64).reshape(-1, NB_COLUMNS)
+
+
+def partitionMicroTasks(utasks, nb_shards):
+    """
+    | Split µtasks into 'nb_shards' contiguous shards with about the same total weight (WEIGHT column).
+    | Shards follow the order of the µtasks (which keeps the pixels of a shard together), each shard is a view of 'utasks'.
+    """
+    utasks = np.asarray(utasks, dtype=np.float64).reshape(-1, NB_COLUMNS)
+    if nb_shards < 1:
+        raise ValueError("at least one shard is required")
+    weights = np.cumsum(utasks[:, WEIGHT])
+    if len(utasks) == 0 or weights[-1] <= 0:
+        weights = np.arange(1, len(utasks) + 1, dtype=np.float64)
+    targets = weights[-1] * np.arange(1, nb_shards) / nb_shards if len(utasks) > 0 else np.zeros(nb_shards - 1)
+    return np.split(utasks, np.searchsorted(weights, targets, side='right'))
+
+
+def renderDistributed(pool, utasks = None, output = "getImage"):
+    """
+    | Render a single image with all the servers of a ClientPool (see surrender.client_pool): the µtasks are generated
+    | once (on the first server unless given), split into shards of the same weight (see partitionMicroTasks), the shards
+    | are rendered concurrently, one per server, and the partial images are summed into the returned image.
+    | All the servers must have the same scene state.
+    | 'output' is the image getter fetching the partial images, its values must be additive ("getImage", "getImageGray32F").
+    """
+    if utasks is None:
+        utasks = generateMicroTasks(pool.clients[0])
+    shards = partitionMicroTasks(utasks, len(pool))
+    return _merge(pool.map(lambda client, shard: _render_shard(client, shard, output), shards))
+
+
+def renderProgressive(client, utasks = None, output = "getImage", strides = (8, 4, 2, 1)):
+    """
+    | Render an image coarse to fine, this is a generator yielding (stride, preview) after each pass.
+    | The µtasks (generated by 'client' unless given) are sorted into passes: the first pass renders the pixels
+    | on a grid of strides[0] pixels, each following pass the pixels on a finer grid not rendered yet, within a pass
+    | the µtasks with the fewest samples come first. Each pass is rendered with renderMicroTasks.
+    | preview is the image at full size where each pixel not rendered yet takes the value of the pixel rendered
+    | at the top-left corner of its grid cell, the last pass (stride 1) yields the final image.
+    | 'output' is the image getter reading the passes, its values must be additive: "getImage" or "getImageGray32F",
+    | other outputs raise a ValueError.
+    """
+    strides = [int(stride) for stride in strides]
+    if not strides or strides[-1] != 1 or min(strides) < 1:
+        raise ValueError("strides must be positive and end with 1: {}".format(strides))
+    if output not in _ADDITIVE_OUTPUTS:
+        raise ValueError("unsupported output: {} (passes are summed, use one of {})".format(output, ", ".join(_ADDITIVE_OUTPUTS)))
+    key, dtype, channels, empty_is_none, byte_planes = client._IMAGE_REPLIES[output]
+    if utasks is None:
+        utasks = generateMicroTasks(client)
+    utasks = np.asarray(utasks, dtype=np.float64).reshape(-1, NB_COLUMNS)
+
+    # Pass of each µtask: the first grid its pixel is on
+    x = utasks[:, X].astype(np.int64)
+    y = utasks[:, Y].astype(np.int64)
+    passes = np.full(len(utasks), len(strides) - 1)
+    for k in reversed(range(len(strides) - 1)):
+        passes[(x % strides[k] == 0) & (y % strides[k] == 0)] = k
+    utasks = utasks[np.lexsort((utasks[:, SAMPLES], passes))]
+    bounds = np.searchsorted(np.sort(passes), np.arange(len(strides) + 1))
+
+    width, height = client.getImageSize()
+    shape = (height, width) if channels == 1 else (height, width, channels)
+    image = np.zeros(shape, dtype=dtype)
+    frame = np.empty(shape, dtype=dtype)
+    for k, stride in enumerate(strides):
+        if bounds[k] == bounds[k + 1]:
+            continue
+        client.renderMicroTasks(utasks[bounds[k]:bounds[k + 1]])
+        image += getattr(client, output)(out = frame)
+        if stride == 1:
+            yield stride, image
+        else:
+            preview = np.repeat(np.repeat(image[::stride, ::stride], stride, axis=0), stride, axis=1)
+            yield stride, preview[:height, :width]
+
+
+# Render the µtasks of 'shard' and return the partial image, None for an empty shard
+def _render_shard(client, shard, output):
+    if len(shard) == 0:
+        return None
+    client.renderMicroTasks(shard)
+    return getattr(client, output)()
+
+
+# Sum partial images
+def _merge(partials):
+    image = None
+    for partial in partials:
+        if partial is None:
+            continue
+        if image is None:
+            image = np.array(partial)
+        else:
+            image += partial
+    return image
+
+
+class MicroTaskScheduler:
+    """
+    | Dynamic distribution of the µtasks of an image over the servers of a ClientPool (see surrender.client_pool).
+    | Unlike renderDistributed, which splits the µtasks once according to their estimated weight, the µtasks are
+    | handed out in small chunks to each server as soon as it has finished its previous chunk, so a server slowed
+    | down by a bad weight estimate simply renders fewer chunks.
+    |     scheduler = MicroTaskScheduler()
+    |     image = scheduler.render(pool)
+    |     for server, start, count, render_seconds, readback_seconds in scheduler.timings:
+    |         ...
+    | The size of the chunks sent to a server follows its measured rendering throughput (the acknowledgement of
+    | renderMicroTasks is timed apart from the readback of the partial image): rendering a chunk should take about
+    | 'target_time' seconds, and at least 'readback_ratio' times the readback of a partial image, whose cost doesn't
+    | depend on the size of the chunk. Chunks are within [min_chunk, max_chunk] µtasks, they also shrink towards
+    | the end of the image so that all the servers finish at about the same time.
+    """
+    def __init__(self, target_time = 0.1, min_chunk = 64, max_chunk = 1 << 20, readback_ratio = 4):
+        if min_chunk < 1 or max_chunk < min_chunk:
+            raise ValueError("invalid chunk size bounds [{}, {}]".format(min_chunk, max_chunk))
+        self.target_time = target_time
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.readback_ratio = readback_ratio
+        # (server index, index of the first µtask, number of µtasks, rendering seconds, readback seconds) of each chunk
+        # rendered by the last call to render
+        self.timings = []
+        # µtasks rendered per second by each server (readback excluded), measured by the last call to render
+        self.throughputs = []
+        self._readbacks = []
+        self._lock = threading.Lock()
+        self._utasks = None
+        self._next = 0
+
+    def render(self, pool, utasks = None, output = "getImage"):
+        """
+        | Render a single image with all the servers of 'pool' and return it.
+        | utasks, output and the requirements on the servers are the same as for renderDistributed.
+        """
+        if utasks is None:
+            utasks = generateMicroTasks(pool.clients[0])
+        self._utasks = np.asarray(utasks, dtype=np.float64).reshape(-1, NB_COLUMNS)
+        self._next = 0
+        self.timings = []
+        self.throughputs = [0.0] * len(pool)
+        self._readbacks = [0.0] * len(pool)
+        try:
+            return _merge(pool.map(lambda client, k: self._work(client, k, output), range(len(pool))))
+        finally:
+            self._utasks = None
+
+    # Worker thread of server k: render chunks until there are none left, return the sum of the partial images
+    def _work(self, client, k, output):
+        image = None
+        while True:
+            chunk = self._take(k)
+            if chunk is None:
+                return image
+            start, utasks = chunk
+            t0 = time.perf_counter()
+            done = client.renderMicroTasks(utasks)
+            if done is not None:
+                # Asynchronous mode: wait for the acknowledgement of the rendering
+                done.result()
+            t1 = time.perf_counter()
+            partial = getattr(client, output)()
+            t2 = time.perf_counter()
+            if image is None:
+                image = np.array(partial)
+            else:
+                image += partial
+            with self._lock:
+                self.timings.append((k, start, len(utasks), t1 - t0, t2 - t1))
+                self._readbacks[k] = t2 - t1
+                rate = len(utasks) / max(t1 - t0, 1e-9)
+                # Smooth the estimate, the first chunk only gives an order of magnitude
+                self.throughputs[k] = rate if self.throughputs[k] == 0 else 0.5 * (self.throughputs[k] + rate)
+
+    # Next chunk (index of its first µtask, µtasks) for server k, None once all the µtasks have been handed out
+    def _take(self, k):
+        with self._lock:
+            remaining = len(self._utasks) - self._next
+            if remaining <= 0:
+                return None
+            if self.throughputs[k] > 0:
+                size = int(self.throughputs[k] * max(self.target_time, self.readback_ratio * self._readbacks[k]))
+            else:
+                size = self.min_chunk
+            # Guided scheduling: never take more than a share of what is left, so the last chunks are small
+            size = min(size, -(-remaining // (2 * len(self.throughputs))))
+            size = min(max(size, self.min_chunk), self.max_chunk, remaining)
+            start = self._next
+            self._next += size
+            return start, self._utasks[start:start + size]
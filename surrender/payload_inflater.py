@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from surrender.qvariant import PayloadSink
+
+# Threads shared by all the inflaters (zlib releases the GIL)
+_executor = None
+_executor_lock = threading.Lock()
+
+def _shared_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers = min(4, os.cpu_count() or 1), thread_name_prefix = "surrender-inflate")
+        return _executor
+
+
+class PayloadInflater(PayloadSink):
+    """
+    | Receives an image payload and decompresses it while it arrives, on a thread of a shared pool.
+    | Compressed payloads are a big endian uint32 holding the uncompressed size followed by a zlib stream.
+    | It is only attached to replies expected to be compressed (see surrender_client.setCompressionLevel). The
+    | "compressed" flag of a reply can come after its payload though, so decompression stops at the first
+    | inconsistency: raw() returns the payload as received, result() the uncompressed data.
+    | The announced size is never trusted for allocations: the output grows with the data actually decompressed
+    | and result() checks it against the size of the image.
+    | Several payloads (image, depth map, normal map, ...) are decompressed in parallel, and in parallel with
+    | the reception of the next ones.
+    """
+    BLOCK_SIZE = 1 << 18
+
+    def __init__(self, into = None, executor = None):
+        """
+        | into is an optional writable memoryview in which the payload is received if it is large enough.
+        """
+        self._into = into
+        self._executor = executor if executor is not None else _shared_executor()
+        self._cond = threading.Condition()
+        self._raw = None
+        self._received = 0
+        self._consumed = 0
+        self._running = False
+        self._failed = False
+        self._decompressor = None
+        self._out = None
+        self._size = None
+
+    def open(self, size):
+        if self._into is not None and size <= len(self._into):
+            self._raw = self._into[:size]
+        else:
+            self._raw = memoryview(bytearray(size))
+        self._into = None
+        return self._raw
+
+    def received(self, n):
+        with self._cond:
+            self._received = n
+            if self._running or self._failed:
+                return
+            self._running = True
+        self._executor.submit(self._run)
+
+    def close(self):
+        return self
+
+    def raw(self):
+        """
+        | Return the payload as received (a memoryview).
+        """
+        return self._raw
+
+    def result(self, expected_size = None):
+        """
+        | Wait for the decompression of the payload and return the uncompressed data.
+        | Raises zlib.error if the payload is not a valid compressed payload, RuntimeError if its size
+        | is not expected_size (when given).
+        """
+        with self._cond:
+            while self._running:
+                self._cond.wait()
+            ok = not self._failed and self._decompressor is not None and self._decompressor.eof and len(self._out) == self._size
+        if ok and (expected_size is None or self._size == expected_size):
+            return self._out
+        size = struct.unpack_from('>I', self._raw, 0)[0]
+        if expected_size is not None and size != expected_size:
+            raise RuntimeError("compressed payload of {} bytes, expected {}".format(size, expected_size))
+        # Decompression was dropped: decompress the whole payload at once to get the proper error (or data)
+        return zlib.decompress(self._raw[4:], bufsize = size)
+
+    # Decompress the data received so far, until there is none left
+    def _run(self):
+        while True:
+            with self._cond:
+                start, end = self._consumed, self._received
+                if start == end or self._failed or (self._decompressor is None and end < 6 and end < len(self._raw)):
+                    self._running = False
+                    self._cond.notify_all()
+                    return
+            try:
+                self._inflate(start, end)
+            except Exception:
+                with self._cond:
+                    self._failed = True
+                    self._running = False
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._consumed = end
+
+    def _inflate(self, start, end):
+        if self._decompressor is None:
+            if end < 6:
+                raise zlib.error("payload too short")
+            # zlib header: deflate method, check bits
+            cmf, flg = self._raw[4], self._raw[5]
+            if cmf & 0x0F != 8 or (cmf * 256 + flg) % 31 != 0:
+                raise zlib.error("not a zlib stream")
+            self._size = struct.unpack_from('>I', self._raw, 0)[0]
+            self._out = bytearray()
+            self._decompressor = zlib.decompressobj()
+            start = 4
+        # Small input blocks keep the output of each call small (large outputs are grown and copied by zlib)
+        for block in range(start, end, self.BLOCK_SIZE):
+            data = self._decompressor.decompress(self._raw[block:min(block + self.BLOCK_SIZE, end)])
+            if len(self._out) + len(data) > self._size:
+                raise zlib.error("payload larger than its header")
+            self._out += data
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+"""
+Products derived on the client from the float RGBA image returned by surrender_client.getImage.
+
+Fetching the image once and deriving the other products locally saves one full frame transfer per product
+compared to getImageGray32F, getImageGray8, getImageRGBA8 and getImageSpectrumProjection:
+    image = client.getImage()
+    gray = products.gray32F(image)
+    gray8 = products.gray8(image)
+    bands = products.spectrumProjection(image, spectra)          # (K, height, width) for K spectra
+    counts = products.spectrumProjectionQuantized(image, spectrum, 12)
+The 8 bits and quantized products map [0-1] to the full integer range, values are clamped and rounded to nearest.
+Every function accepts an optional 'out' array receiving the result.
+"""
+
+import numpy as np
+
+# Weights of the 4 channels giving the mean of the first 3
+_GRAY = np.array([1.0 / 3, 1.0 / 3, 1.0 / 3, 0.0], dtype=np.float32)
+
+
+def _check_image(image):
+    if image.ndim != 3 or image.shape[2] != 4:
+        raise ValueError("expected a (height, width, 4) image, got shape {}".format(image.shape))
+
+
+def gray32F(image, out = None):
+    """
+    | Same as surrender_client.getImageGray32F: the mean of the first 3 channels, (height, width) float32.
+    """
+    _check_image(image)
+    return np.matmul(image, _GRAY, out = out)
+
+
+def gray8(image, out = None):
+    """
+    | Same as surrender_client.getImageGray8: the mean of the first 3 channels mapped to 8 bits, (height, width) uint8.
+    """
+    return quantize(gray32F(image), 8, out)
+
+
+def rgba8(image, out = None):
+    """
+    | Same as surrender_client.getImageRGBA8: the 4 channels mapped to 8 bits, (height, width, 4) uint8.
+    """
+    _check_image(image)
+    return quantize(image, 8, out)
+
+
+def spectrumProjection(image, spectra, out = None):
+    """
+    | Same as surrender_client.getImageSpectrumProjection: the projection of each pixel on a spectrum (4 weights),
+    | (height, width) float32.
+    | 'spectra' can also be a (K, 4) array of K spectra, projected in a single matrix product: the result is then
+    | a (K, height, width) float32 array.
+    """
+    _check_image(image)
+    spectra = np.asarray(spectra, dtype=np.float32)
+    if spectra.shape[-1] != 4 or spectra.ndim > 2:
+        raise ValueError("expected spectra of 4 values, got shape {}".format(spectra.shape))
+    if spectra.ndim == 1:
+        return np.matmul(image, spectra, out = out)
+    h, w = image.shape[:2]
+    if out is None:
+        out = np.empty((len(spectra), h, w), dtype=np.float32)
+    elif out.shape != (len(spectra), h, w) or not out.flags.c_contiguous:
+        raise ValueError("'out' must be a contiguous ({}, {}, {}) array".format(len(spectra), h, w))
+    # (K, 4) x (4, h * w): the result is laid out band by band without any transposition
+    np.matmul(spectra, image.reshape(h * w, 4).T, out = out.reshape(len(spectra), h * w))
+    return out
+
+
+def quantize(values, nbits, out = None):
+    """
+    | Map [0-1] values to [0, 2^nbits - 1] integers, stored as uint8 if nbits <= 8, as uint16 otherwise
+    | (see surrender_client.saveImageSpectrumProjectionQuantized).
+    """
+    if not 1 <= nbits <= 16:
+        raise ValueError("nbits must be in [1, 16]")
+    scale = float((1 << nbits) - 1)
+    dtype = np.uint8 if nbits <= 8 else np.uint16
+    scaled = np.multiply(values, np.float32(scale), dtype=np.float32)
+    np.clip(scaled, 0, scale, out = scaled)
+    np.rint(scaled, out = scaled)
+    if out is None:
+        return scaled.astype(dtype)
+    np.copyto(out, scaled, casting='unsafe')
+    return out
+
+
+def spectrumProjectionQuantized(image, spectra, nbits, out = None):
+    """
+    | Projection on one spectrum or a (K, 4) batch of spectra (see spectrumProjection) quantized on 'nbits' bits
+    | (see quantize), like the images written by surrender_client.saveImageSpectrumProjectionQuantized.
+    """
+    return quantize(spectrumProjection(image, spectra), nbits, out)
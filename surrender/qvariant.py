@@ -0,0 +1,855 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+"""
+QVariant serialization used by the SurRender protocol.
+
+Every message is a QHash<QString, QVariant> serialized with QDataStream (big endian):
+each value is a type id (uint32), a null flag (uint8) and the value itself.
+The encoder and the decoder are table driven: writers are indexed by Python type, readers by type id.
+They don't depend on the transport and can be used (and benchmarked) on their own.
+"""
+
+import abc
+import struct
+import numpy as np
+
+# QVariant type ids
+DT_Invalid = 0
+DT_Bool = 1
+DT_Int = 2
+DT_UInt = 3
+DT_ULongLong = 5
+DT_Double = 6
+DT_Map = 8
+DT_List = 9
+DT_String = 10
+DT_ByteArray = 12
+DT_Hash = 28
+
+# Null QString / QByteArray
+_NULL_SIZE = 0xFFFFFFFF
+
+# Precompiled packers: type id + null flag + value
+_UINT32 = struct.Struct('>I')
+_HEADER = struct.Struct('>IB')
+_HEADER_SIZE = struct.Struct('>IBI')
+_TAGGED_BOOL = struct.Struct('>IBB')
+_TAGGED_INT = struct.Struct('>IBi')
+_TAGGED_UINT = struct.Struct('>IBI')
+_TAGGED_ULONGLONG = struct.Struct('>IBQ')
+_TAGGED_DOUBLE = struct.Struct('>IBd')
+_TAGGED_INVALID = _HEADER.pack(DT_Invalid, 0)
+
+# Precompiled unpackers: null flag + value
+_NULL = struct.Struct('>B')
+_NULL_BOOL = struct.Struct('>BB')
+_NULL_INT = struct.Struct('>Bi')
+_NULL_UINT = struct.Struct('>BI')
+_NULL_ULONGLONG = struct.Struct('>BQ')
+_NULL_DOUBLE = struct.Struct('>Bd')
+_NULL_SIZE_HEADER = struct.Struct('>BI')
+
+# Wire type of the values of lists which can be decoded as numpy arrays
+_NUMPY_LIST_TYPES = { DT_Bool : 'u1', DT_Int : '>i4', DT_UInt : '>u4', DT_ULongLong : '>u8', DT_Double : '>f8' }
+
+
+# Layout of the elements of a list decoded as a numpy array: the record dtype of a T (m is None) or of a list of m T,
+# and the dtype of the decoded values
+def _numpy_list_layout(T, m):
+    value_type = np.dtype(_NUMPY_LIST_TYPES[T])
+    native_type = np.dtype(bool) if T == DT_Bool else value_type.newbyteorder('=')
+    dt = np.dtype([('type', '>u4'), ('null', 'u1'), ('value', value_type)])
+    if m is not None:
+        dt = np.dtype([('type', '>u4'), ('null', 'u1'), ('size', '>u4'), ('value', dt, (m,))])
+    return dt, native_type
+
+
+# Decode the 'count' records of layout dt starting at 'offset' in 'buffer' up to the first one that doesn't match it.
+# Returns the number of matching records and their values (None if there is none), which don't refer to the buffer.
+def _read_numpy_records(buffer, offset, count, dt, T, m, native_type):
+    records = np.frombuffer(buffer, dtype=dt, count=count, offset=offset)
+    if m is None:
+        ok = records['type'] == T
+        values = records['value']
+    else:
+        ok = (records['type'] == DT_List) & (records['size'] == m) & np.all(records['value']['type'] == T, axis=1)
+        values = records['value']['value']
+    c = count if ok.all() else int(np.argmin(ok))
+    return c, (values[:c].astype(native_type) if c > 0 else None)
+
+
+class QVariantEncoder:
+    """
+    | Serializes values into a growing buffer (bytearray).
+    | The transport sends 'buffer' when it wants and empties it.
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+        self._writers = dict(QVariantEncoder._WRITERS)
+
+    def reset(self):
+        del self.buffer[:]
+
+    def takeData(self):
+        """
+        | Return the serialized data (a bytearray) and start a new buffer.
+        """
+        data = self.buffer
+        self.buffer = bytearray()
+        return data
+
+    def writeQVariantHash(self, table):
+        """
+        | Serialize a dictionnary (which maps strings to values) as a QHash<QString, QVariant>.
+        """
+        self._write_map(table)
+
+    def write(self, v):
+        """
+        | Serialize a value as a QVariant.
+        """
+        T = type(v)
+        writer = self._writers.get(T)
+        if writer is None:
+            writer = self._lookup(T)
+        writer(self, v)
+
+    # Types without a writer are resolved once through their base classes, Invalid if none matches
+    def _lookup(self, T):
+        writer = QVariantEncoder._write_invalid
+        for base in T.__mro__[1:]:
+            if base in QVariantEncoder._WRITERS:
+                writer = QVariantEncoder._WRITERS[base]
+                break
+        self._writers[T] = writer
+        return writer
+
+    def _write_string(self, v):
+        v = str(v)
+        if v == '':
+            self.buffer += _UINT32.pack(_NULL_SIZE)
+            return
+        data = v.encode('utf-16be')
+        self.buffer += _UINT32.pack(len(data))
+        self.buffer += data
+
+    def _write_map(self, table):
+        self.buffer += _UINT32.pack(len(table))
+        for k in table:
+            self._write_string(k)
+            self.write(table[k])
+
+    def _write_invalid(self, v):
+        self.buffer += _TAGGED_INVALID
+
+    def _write_bool(self, v):
+        self.buffer += _TAGGED_BOOL.pack(DT_Bool, 0, 1 if v else 0)
+
+    def _write_int(self, v):
+        if v >= -2147483648 and v <= 2147483647:
+            self.buffer += _TAGGED_INT.pack(DT_Int, 0, v)
+        elif v >= 0 and v <= 4294967295:
+            self.buffer += _TAGGED_UINT.pack(DT_UInt, 0, v)
+        else:
+            self.buffer += _TAGGED_ULONGLONG.pack(DT_ULongLong, 0, v)
+
+    def _write_double(self, v):
+        self.buffer += _TAGGED_DOUBLE.pack(DT_Double, 0, v)
+
+    def _write_tagged_string(self, v):
+        self.buffer += _HEADER.pack(DT_String, 0)
+        self._write_string(v)
+
+    def _write_hash(self, v):
+        self.buffer += _HEADER.pack(DT_Hash, 0)
+        self._write_map(v)
+
+    def _write_list(self, v):
+        self.buffer += _HEADER_SIZE.pack(DT_List, 0, len(v))
+        for k in v:
+            self.write(k)
+
+    def _write_bytearray(self, v):
+        if len(v) == 0:
+            self.buffer += _HEADER_SIZE.pack(DT_ByteArray, 0, _NULL_SIZE)
+            return
+        self.buffer += _HEADER_SIZE.pack(DT_ByteArray, 0, len(v))
+        self.buffer += v
+
+    # Numeric numpy arrays: the whole (nested) QVariantList is built by numpy in one block.
+    # Floats are sent as doubles, integers as int32 when they all fit, anything else element by element.
+    def _write_ndarray(self, a):
+        if a.ndim == 0:
+            self.write(a[()])
+            return
+        if a.dtype.kind == 'f':
+            T, value_type = DT_Double, '>f8'
+        elif a.dtype.kind in 'iu' and a.size > 0 and a.min() >= -2147483648 and a.max() <= 2147483647:
+            T, value_type = DT_Int, '>i4'
+        else:
+            self._write_list(a)
+            return
+
+        # Each element is (type, null flag, value), each nested list is (type, null flag, size, elements)
+        dt = np.dtype([('type', '>u4'), ('null', 'u1'), ('value', value_type)])
+        for n in reversed(a.shape[1:]):
+            dt = np.dtype([('type', '>u4'), ('null', 'u1'), ('size', '>u4'), ('value', dt, (n,))])
+        block = np.empty(a.shape[0], dtype=dt)
+        level = block
+        for n in a.shape[1:]:
+            level['type'] = DT_List
+            level['null'] = 0
+            level['size'] = n
+            level = level['value']
+        level['type'] = T
+        level['null'] = 0
+        level['value'] = a
+
+        self.buffer += _HEADER_SIZE.pack(DT_List, 0, a.shape[0])
+        self.buffer += block.view(np.uint8).data
+
+QVariantEncoder._WRITERS = {
+    bool : QVariantEncoder._write_bool,
+    np.bool_ : QVariantEncoder._write_bool,
+    int : QVariantEncoder._write_int,
+    float : QVariantEncoder._write_double,
+    str : QVariantEncoder._write_tagged_string,
+    dict : QVariantEncoder._write_hash,
+    list : QVariantEncoder._write_list,
+    tuple : QVariantEncoder._write_list,          # Interpret tuples and numpy arrays as lists
+    np.ndarray : QVariantEncoder._write_ndarray,
+    bytes : QVariantEncoder._write_bytearray,
+    bytearray : QVariantEncoder._write_bytearray,
+    type(None) : QVariantEncoder._write_invalid,
+}
+for _T in set(np.sctypeDict.values()):
+    if issubclass(_T, np.integer):
+        QVariantEncoder._WRITERS[_T] = QVariantEncoder._write_int
+    elif issubclass(_T, np.floating):
+        QVariantEncoder._WRITERS[_T] = QVariantEncoder._write_double
+
+
+class PayloadSink(abc.ABC):
+    """
+    | Destination of a byte array consumed while it is received (see QVariantDecoder.payload_buffers).
+    """
+    def begin(self, fields):
+        """
+        | Called when the byte array is reached in a message, 'fields' holds the entries of the message decoded before it.
+        """
+
+    @abc.abstractmethod
+    def open(self, size):
+        """
+        | Return a writable buffer of 'size' bytes in which the payload is received.
+        """
+
+    def received(self, n):
+        """
+        | Called each time more of the payload has arrived, n is the number of bytes received so far.
+        """
+
+    @abc.abstractmethod
+    def close(self):
+        """
+        | Called once the whole payload has been received, return the decoded value.
+        """
+
+
+class QVariantDecoder:
+    """
+    | Deserializes values from an internal buffer.
+    | 'recv(n)' is called to get more bytes (at least one, up to n) when the buffer runs out of data,
+    | 'recv_into(view)' to receive large payloads directly in their destination.
+    | Without 'recv', data has to be provided with 'feed' and EOFError is raised when it is not enough.
+    """
+    def __init__(self, recv = None, recv_into = None):
+        self.buffer = bytearray()
+        self.pos = 0
+        self.read_size = 1 << 16
+        # Decode lists of numbers as numpy arrays
+        self.numpy_lists = False
+        # Destination buffers (or PayloadSinks) for byte arrays of the next message, indexed by key
+        self.payload_buffers = {}
+        # PayloadSinks are notified every time this many bytes have been received
+        self.sink_notify_size = 1 << 18
+        self._recv = recv
+        self._recv_into_cb = recv_into
+
+    def reset(self):
+        del self.buffer[:]
+        self.pos = 0
+        self.payload_buffers.clear()
+
+    def feed(self, data):
+        """
+        | Append bytes to the decoding buffer.
+        """
+        self.buffer += data
+
+    def available(self):
+        """
+        | Return the number of bytes buffered and not decoded yet.
+        """
+        return len(self.buffer) - self.pos
+
+    def readQVariantHash(self, numpy_lists = None):
+        """
+        | Deserialize a dictionnary (which maps strings to values) from a QHash<QString, QVariant>.
+        | numpy_lists overrides the 'numpy_lists' attribute for this message.
+        """
+        if numpy_lists is None:
+            return self._read_map()
+        mode = self.numpy_lists
+        self.numpy_lists = bool(numpy_lists)
+        try:
+            return self._read_map()
+        finally:
+            self.numpy_lists = mode
+
+    def read(self, into = None):
+        """
+        | Deserialize a QVariant. 'into' is an optional destination buffer used if the value is a byte array.
+        """
+        T = self._unpack(_UINT32)
+        reader = QVariantDecoder._READERS.get(T)
+        if reader is None:
+            raise RuntimeError('Unsupported type: {}'.format(T))
+        if T == DT_ByteArray:
+            return reader(self, into)
+        return reader(self)
+
+    # Buffer management
+    # Make sure at least l bytes are available in the buffer
+    def _fill(self, l):
+        if self.pos > 0:
+            del self.buffer[:self.pos]
+            self.pos = 0
+        while len(self.buffer) < l:
+            if self._recv is None:
+                raise EOFError('QVariant decoder: {} bytes required, {} available'.format(l, len(self.buffer)))
+            self.buffer += self._recv(max(l - len(self.buffer), self.read_size))
+
+    def _ensure(self, l):
+        if len(self.buffer) - self.pos < l:
+            self._fill(l)
+
+    def _peek_uint32(self, offset):
+        return _UINT32.unpack_from(self.buffer, self.pos + offset)[0]
+
+    def _unpack(self, packer):
+        if len(self.buffer) - self.pos < packer.size:
+            self._fill(packer.size)
+        ret = packer.unpack_from(self.buffer, self.pos)[0]
+        self.pos += packer.size
+        return ret
+
+    # Unpack a null flag followed by a value
+    def _unpack_value(self, packer):
+        if len(self.buffer) - self.pos < packer.size:
+            self._fill(packer.size)
+        ret = packer.unpack_from(self.buffer, self.pos)[1]
+        self.pos += packer.size
+        return ret
+
+    def _recv_bytes(self, l):
+        if len(self.buffer) - self.pos < l:
+            self._fill(l)
+        ret = bytes(self.buffer[self.pos:self.pos + l])
+        self.pos += l
+        return ret
+
+    # Receive exactly len(view) bytes into a writable buffer.
+    # Only what is already buffered is copied, the rest goes straight from the transport.
+    def _recv_into(self, view):
+        n = min(len(self.buffer) - self.pos, len(view))
+        if n > 0:
+            with memoryview(self.buffer) as buf:
+                view[:n] = buf[self.pos:self.pos + n]
+            self.pos += n
+        if n < len(view) and self._recv_into_cb is None:
+            self._fill(len(view) - n)
+            self._recv_into(view[n:])
+            return
+        while n < len(view):
+            n += self._recv_into_cb(view[n:])
+
+    # Readers
+    def _read_string(self):
+        l = self._unpack(_UINT32)
+        if l == _NULL_SIZE:
+            return ''
+        return self._recv_bytes(l).decode('utf-16be')
+
+    def _read_map(self):
+        nb_elts = self._unpack(_UINT32)
+        table = {}
+        for i in range(nb_elts):
+            k = self._read_string()
+            if k in self.payload_buffers:
+                into = self.payload_buffers.pop(k)
+                if isinstance(into, PayloadSink):
+                    into.begin(table)
+                table[k] = self.read(into)
+            else:
+                table[k] = self.read()
+        return table
+
+    def _read_list_items(self, nb_elts, table):
+        for i in range(nb_elts):
+            table.append(self.read())
+        return table
+
+    # Large payloads (images, ...) are received in a bytearray allocated once with its final size,
+    # or in the 'into' buffer if it is large enough (a memoryview on the received part is returned)
+    def _read_bytearray(self, into = None):
+        l = self._unpack(_UINT32)
+        if l == 0 or l == _NULL_SIZE:
+            return b''
+        if isinstance(into, PayloadSink):
+            return self._recv_sink(into, l)
+        if into is not None and l <= len(into):
+            ret = into[:l]
+            self._recv_into(ret)
+            return ret
+        if l < self.read_size:
+            return self._recv_bytes(l)
+        ret = bytearray(l)
+        with memoryview(ret) as view:
+            self._recv_into(view)
+        return ret
+
+    # Receive a payload of l bytes through a PayloadSink, notifying it as data arrives
+    def _recv_sink(self, sink, l):
+        view = sink.open(l)
+        n = min(len(self.buffer) - self.pos, l)
+        if n > 0:
+            with memoryview(self.buffer) as buf:
+                view[:n] = buf[self.pos:self.pos + n]
+            self.pos += n
+        if n < l and self._recv_into_cb is None:
+            self._recv_into(view[n:])
+            n = l
+        notified = 0
+        while True:
+            if n - notified >= self.sink_notify_size or n == l:
+                sink.received(n)
+                notified = n
+            if n == l:
+                return sink.close()
+            n += self._recv_into_cb(view[n:])
+
+    def _read_tagged_invalid(self):
+        self._unpack(_NULL)
+        return None
+
+    def _read_tagged_bool(self):
+        return self._unpack_value(_NULL_BOOL) != 0
+
+    def _read_tagged_int(self):
+        return self._unpack_value(_NULL_INT)
+
+    def _read_tagged_uint(self):
+        return self._unpack_value(_NULL_UINT)
+
+    def _read_tagged_ulonglong(self):
+        return self._unpack_value(_NULL_ULONGLONG)
+
+    def _read_tagged_double(self):
+        return self._unpack_value(_NULL_DOUBLE)
+
+    def _read_tagged_string(self):
+        l = self._unpack_value(_NULL_SIZE_HEADER)
+        if l == _NULL_SIZE:
+            return ''
+        return self._recv_bytes(l).decode('utf-16be')
+
+    def _read_tagged_map(self):
+        self._unpack(_NULL)
+        return self._read_map()
+
+    def _read_tagged_list(self):
+        nb_elts = self._unpack_value(_NULL_SIZE_HEADER)
+        if self.numpy_lists and nb_elts > 0:
+            return self._read_list_numpy(nb_elts)
+        return self._read_list_items(nb_elts, [])
+
+    def _read_tagged_bytearray(self, into = None):
+        self._unpack(_NULL)
+        return self._read_bytearray(into)
+
+    # Decodes a list made of numbers of the same type as a 1D numpy array, a list made of lists of the same size of such numbers
+    # as a 2D array. Records are checked by blocks straight from the buffer, if one doesn't match the whole list
+    # is returned as a regular list, nested lists included (see _read_list_plain).
+    # Since every element takes at least 5 bytes, we never wait for more data than what the list is known to contain.
+    def _read_list_numpy(self, nb_elts):
+        self._ensure(5)
+        T = self._peek_uint32(0)
+        m = None
+        if T == DT_List:
+            self._ensure(9)
+            m = self._peek_uint32(5)
+            if m > 0:
+                self._ensure(14)
+                T = self._peek_uint32(9)
+        if m is None and T not in _NUMPY_LIST_TYPES:
+            return self._read_list_items(nb_elts, [])
+        if T not in _NUMPY_LIST_TYPES or m == 0:
+            return self._read_list_plain(nb_elts, [])
+
+        dt, native_type = _numpy_list_layout(T, m)
+        value_size = np.dtype(_NUMPY_LIST_TYPES[T]).itemsize
+
+        chunks = []
+        i = 0
+        while i < nb_elts:
+            left = nb_elts - i
+            if len(self.buffer) - self.pos < dt.itemsize and not self._check_next_record(T, m, value_size):
+                break
+            self._ensure(min(left * dt.itemsize, max(len(self.buffer) - self.pos, 5 * left)))
+            k = min(left, (len(self.buffer) - self.pos) // dt.itemsize)
+            c, values = _read_numpy_records(self.buffer, self.pos, k, dt, T, m, native_type)
+            if c > 0:
+                chunks.append(values)
+            self.pos += c * dt.itemsize
+            i += c
+            if c < k:
+                break
+
+        if i == nb_elts:
+            return np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+        table = np.concatenate(chunks).tolist() if chunks else []
+        return self._read_list_plain(nb_elts - i, table)
+
+    # Rest of a list of numbers (or of lists) which can't be decoded as an array: its nested lists are decoded as lists
+    # too, like the elements already decoded, so that a list never mixes lists and arrays
+    def _read_list_plain(self, nb_elts, table):
+        mode = self.numpy_lists
+        self.numpy_lists = False
+        try:
+            return self._read_list_items(nb_elts, table)
+        finally:
+            self.numpy_lists = mode
+
+    # Check that the next element of a list is a T (m is None) or a list of m T, waiting only for data known to be there
+    def _check_next_record(self, T, m, value_size):
+        self._ensure(5)
+        if m is None:
+            if self._peek_uint32(0) != T:
+                return False
+            self._ensure(5 + value_size)
+            return True
+        if self._peek_uint32(0) != DT_List:
+            return False
+        self._ensure(9)
+        if self._peek_uint32(5) != m:
+            return False
+        offset = 9
+        for j in range(m):
+            self._ensure(offset + 5)
+            if self._peek_uint32(offset) != T:
+                return False
+            offset += 5 + value_size
+            self._ensure(offset)
+        return True
+
+QVariantDecoder._READERS = {
+    DT_Invalid : QVariantDecoder._read_tagged_invalid,
+    DT_Bool : QVariantDecoder._read_tagged_bool,
+    DT_Int : QVariantDecoder._read_tagged_int,
+    DT_UInt : QVariantDecoder._read_tagged_uint,
+    DT_ULongLong : QVariantDecoder._read_tagged_ulonglong,
+    DT_Double : QVariantDecoder._read_tagged_double,
+    DT_String : QVariantDecoder._read_tagged_string,
+    DT_Map : QVariantDecoder._read_tagged_map,
+    DT_Hash : QVariantDecoder._read_tagged_map,
+    DT_List : QVariantDecoder._read_tagged_list,
+    DT_ByteArray : QVariantDecoder._read_tagged_bytearray,
+}
+
+
+# Frame kinds of QVariantHashParser
+_MAP = 0
+_LIST = 1
+_BYTES = 2
+
+class _Frame:
+    __slots__ = ('kind', 'value', 'left', 'key', 'filled', 'record', 'chunks', 'plain')
+
+    # plain: lists nested in the container are not decoded as arrays (see QVariantDecoder._read_list_plain)
+    def __init__(self, kind, value, left, plain = False):
+        self.kind = kind
+        self.value = value
+        self.left = left
+        self.key = None
+        self.filled = 0
+        self.record = None
+        self.chunks = None
+        self.plain = plain
+
+# Fixed size scalars: packer of type id + null flag + value
+_TAGGED_SCALARS = {
+    DT_Bool : _TAGGED_BOOL,
+    DT_Int : _TAGGED_INT,
+    DT_UInt : _TAGGED_UINT,
+    DT_ULongLong : _TAGGED_ULONGLONG,
+    DT_Double : _TAGGED_DOUBLE,
+}
+
+
+class QVariantHashParser:
+    """
+    | Incremental (push) parser for a stream of QHash<QString, QVariant> messages, independent of any transport.
+    | Feed it byte chunks of any size as they arrive: feed returns the list of messages completed by the chunk.
+    | Parsing progresses with the data, nothing is parsed twice: containers are kept on a stack between chunks,
+    | large byte arrays are copied chunk by chunk into their final buffer and lists of numbers are decoded
+    | block by block when numpy_lists is enabled (see QVariantDecoder).
+    """
+    def __init__(self, numpy_lists = False):
+        self.buffer = bytearray()
+        self.pos = 0
+        self.numpy_lists = numpy_lists
+        # Destination buffers for byte arrays of the next messages, indexed by key (PayloadSinks are not supported)
+        self.payload_buffers = {}
+        # Byte arrays from this size are received chunk by chunk, smaller ones at once
+        self.large_payload_size = 1 << 16
+        self._stack = []
+        self._messages = []
+
+    def reset(self):
+        del self.buffer[:]
+        self.pos = 0
+        self.payload_buffers.clear()
+        del self._stack[:]
+        del self._messages[:]
+
+    def pending(self):
+        """
+        | Return True if a message has been partially received.
+        """
+        return len(self._stack) > 0 or self.pos < len(self.buffer)
+
+    def feed(self, data):
+        """
+        | Push a chunk of bytes, return the list of messages it completes (possibly empty).
+        """
+        with memoryview(data) as view:
+            view = view.cast('B')
+            # Bytes for a payload being received go straight to their destination
+            while len(view) > 0 and self._stack and self._stack[-1].kind == _BYTES and self.pos == len(self.buffer):
+                f = self._stack[-1]
+                n = min(len(view), f.left)
+                f.value[f.filled:f.filled + n] = view[:n]
+                f.filled += n
+                f.left -= n
+                view = view[n:]
+                if f.left == 0:
+                    self._stack.pop()
+                    self._deliver(f.value)
+            self.buffer += view
+        try:
+            while self._step():
+                pass
+        finally:
+            del self.buffer[:self.pos]
+            self.pos = 0
+        messages = self._messages
+        self._messages = []
+        return messages
+
+    def _peek_uint32(self, offset):
+        return _UINT32.unpack_from(self.buffer, self.pos + offset)[0]
+
+    def _deliver(self, value):
+        if not self._stack:
+            self._messages.append(value)
+            return
+        f = self._stack[-1]
+        if f.kind == _MAP:
+            f.value[f.key] = value
+            f.key = None
+        else:
+            f.value.append(value)
+        f.left -= 1
+
+    # Parse the next token, return False when more data is needed
+    def _step(self):
+        avail = len(self.buffer) - self.pos
+        if not self._stack:
+            if avail < 4:
+                return False
+            self._stack.append(_Frame(_MAP, {}, self._peek_uint32(0)))
+            self.pos += 4
+            return True
+
+        f = self._stack[-1]
+        if f.kind == _BYTES:
+            n = min(avail, f.left)
+            if n == 0:
+                return False
+            with memoryview(self.buffer) as buf:
+                f.value[f.filled:f.filled + n] = buf[self.pos:self.pos + n]
+            self.pos += n
+            f.filled += n
+            f.left -= n
+            if f.left == 0:
+                self._stack.pop()
+                self._deliver(f.value)
+            return True
+
+        if f.left == 0:
+            self._stack.pop()
+            if f.kind == _LIST and f.chunks is not None:
+                self._deliver(np.concatenate(f.chunks) if len(f.chunks) > 1 else f.chunks[0])
+            else:
+                self._deliver(f.value)
+            return True
+
+        if f.kind == _MAP and f.key is None:
+            if avail < 4:
+                return False
+            l = self._peek_uint32(0)
+            if l == _NULL_SIZE:
+                f.key = ''
+                self.pos += 4
+            else:
+                if avail < 4 + l:
+                    return False
+                f.key = bytes(self.buffer[self.pos + 4:self.pos + 4 + l]).decode('utf-16be')
+                self.pos += 4 + l
+            return True
+
+        if f.kind == _LIST and self.numpy_lists and not f.plain and f.record is not False:
+            progress = self._step_numpy(f, avail)
+            if progress is not None:
+                return progress
+        return self._step_value(f, avail)
+
+    def _step_value(self, f, avail):
+        if avail < 5:
+            return False
+        T = self._peek_uint32(0)
+        packer = _TAGGED_SCALARS.get(T)
+        if packer is not None:
+            if avail < packer.size:
+                return False
+            v = packer.unpack_from(self.buffer, self.pos)[2]
+            self.pos += packer.size
+            self._deliver(v != 0 if T == DT_Bool else v)
+        elif T == DT_Invalid:
+            self.pos += 5
+            self._deliver(None)
+        else:
+            if avail < 9:
+                return False
+            l = self._peek_uint32(5)
+            if T == DT_String:
+                if l == _NULL_SIZE:
+                    self.pos += 9
+                    self._deliver('')
+                    return True
+                if avail < 9 + l:
+                    return False
+                v = bytes(self.buffer[self.pos + 9:self.pos + 9 + l]).decode('utf-16be')
+                self.pos += 9 + l
+                self._deliver(v)
+            elif T == DT_Map or T == DT_Hash:
+                self.pos += 9
+                self._stack.append(_Frame(_MAP, {}, l, f.plain))
+            elif T == DT_List:
+                self.pos += 9
+                self._stack.append(_Frame(_LIST, [], l, f.plain))
+            elif T == DT_ByteArray:
+                if l == 0 or l == _NULL_SIZE:
+                    self.pos += 9
+                    self._deliver(b'')
+                    return True
+                into = self.payload_buffers.get(f.key) if f.kind == _MAP else None
+                if into is not None and l <= len(into):
+                    del self.payload_buffers[f.key]
+                    dest = into[:l]
+                elif l < self.large_payload_size:
+                    if avail < 9 + l:
+                        return False
+                    v = bytes(self.buffer[self.pos + 9:self.pos + 9 + l])
+                    self.pos += 9 + l
+                    self._deliver(v)
+                    return True
+                else:
+                    dest = bytearray(l)
+                self.pos += 9
+                self._stack.append(_Frame(_BYTES, dest, l))
+            else:
+                raise RuntimeError('Unsupported type: {}'.format(T))
+        return True
+
+    # numpy_lists mode: consume all the buffered records matching the layout of the first element of the list.
+    # Returns None once the list has to be decoded element by element.
+    def _step_numpy(self, f, avail):
+        if f.record is None:
+            # Layout of the records, only data known to be there is awaited (every element takes at least 5 bytes)
+            if avail < 5:
+                return False
+            T = self._peek_uint32(0)
+            m = None
+            if T == DT_List:
+                if avail < 9:
+                    return False
+                m = self._peek_uint32(5)
+                if m == 0:
+                    f.record = False
+                    f.plain = True
+                    return None
+                if avail < 14:
+                    return False
+                T = self._peek_uint32(9)
+            if T not in _NUMPY_LIST_TYPES:
+                f.record = False
+                f.plain = m is not None
+                return None
+            dt, native_type = _numpy_list_layout(T, m)
+            f.record = (dt, T, m, np.dtype(_NUMPY_LIST_TYPES[T]).itemsize, native_type)
+            f.chunks = []
+
+        dt, T, m, value_size, native_type = f.record
+        if avail < dt.itemsize:
+            if self._check_partial_record(T, m, value_size, avail):
+                return False
+            self._to_generic(f)
+            return None
+
+        k = min(f.left, avail // dt.itemsize)
+        c, values = _read_numpy_records(self.buffer, self.pos, k, dt, T, m, native_type)
+        if c > 0:
+            f.chunks.append(values)
+        self.pos += c * dt.itemsize
+        f.left -= c
+        if c < k:
+            self._to_generic(f)
+            return True if c > 0 else None
+        return True
+
+    # Check the beginning of an incomplete record: True if it matches the layout so far (it is then safe to wait for the rest)
+    def _check_partial_record(self, T, m, value_size, avail):
+        if avail < 5:
+            return True
+        if m is None:
+            return self._peek_uint32(0) == T
+        if self._peek_uint32(0) != DT_List:
+            return False
+        if avail < 9:
+            return True
+        if self._peek_uint32(5) != m:
+            return False
+        offset = 9
+        while offset + 5 <= avail:
+            if self._peek_uint32(offset) != T:
+                return False
+            offset += 5 + value_size
+        return True
+
+    def _to_generic(self, f):
+        f.value = np.concatenate(f.chunks).tolist() if f.chunks else []
+        f.record = False
+        f.plain = True
+        f.chunks = None
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+import json
+import math
+import multiprocessing
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+_MAGIC = b'SRFRING1'
+# The layout description (JSON) is stored after the magic number and its size, control data starts at this offset
+_CONTROL_OFFSET = 4096
+_ALIGNMENT = 64
+# Value of the position of an unused reader
+_INACTIVE = np.iinfo(np.uint64).max
+# Per slot metadata: sequence number (see SharedFrameRing), frame index, pose (x, y, z, q0, q1, q2, q3), integration time
+_SLOT_HEADER = np.dtype([('seq', '<u8'), ('frame_index', '<i8'), ('pose', '<f8', (7,)), ('integration_time', '<f8')])
+_POLL_PERIOD = 0.0005
+
+
+def _align(n):
+    return (n + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def frameRingLayout(client, outputs = ("getImage",)):
+    """
+    | Return the outputs argument of SharedFrameRing for the image getters 'outputs' of 'client'
+    | at the current image size of its server.
+    """
+    width, height = client.getImageSize()
+    layout = {}
+    for name in outputs:
+        if name not in client._IMAGE_REPLIES or name == "getImageSpectrumProjection":
+            raise ValueError("unsupported output: {}".format(name))
+        key, dtype, channels, empty_is_none, byte_planes = client._IMAGE_REPLIES[name]
+        layout[name] = ((height, width) if channels == 1 else (height, width, channels), dtype)
+    return layout
+
+
+class SharedFrameRing:
+    """
+    | Ring buffer of frames in shared memory (multiprocessing.shared_memory), written by one process and read
+    | without copies by worker processes.
+    | The rendering process creates the ring and writes each frame in place with the image getters:
+    |     ring = SharedFrameRing(outputs = frameRingLayout(client, ("getImage", "getDepthMap")), nb_slots = 4)
+    |     for i in range(n):
+    |         client.render()
+    |         ring.writeFrame(client, i, pose = camera_pose, integration_time = dt)
+    | Workers attach to it by name and read the frames as numpy arrays mapped on the shared memory:
+    |     ring = SharedFrameRing(name)
+    |     reader = ring.reader(worker_id)
+    |     while True:
+    |         frame = reader.next()
+    |         process(frame.frame_index, frame.pose, frame["getImage"], frame["getDepthMap"])
+    | Each frame is written in the next slot, which holds its metadata: frame index, pose (position and attitude
+    | quaternion, 7 values) and integration time.
+    | Readers have a position (the frame they hold, see FrameReader.next): by default the writer waits for all the
+    | readers to release a slot before reusing it. A slot holds a sequence number, odd while it is being written,
+    | which lets readers of a writer that doesn't wait detect overwritten frames (see SharedFrame.valid).
+    """
+    def __init__(self, name = None, outputs = None, nb_slots = 4, nb_readers = 8):
+        """
+        | If 'outputs' is given a new ring is created ('name' is chosen if None), it maps the name of each output
+        | to its (shape, dtype). Otherwise the process attaches to the existing ring 'name'.
+        """
+        if outputs is None:
+            if name is None:
+                raise ValueError("the name of the ring is required to attach to it")
+            self._shm = self._attach(name)
+            self._owner = False
+            size = struct.unpack_from('<I', self._shm.buf, len(_MAGIC))[0]
+            if bytes(self._shm.buf[:len(_MAGIC)]) != _MAGIC:
+                raise RuntimeError("{} is not a SharedFrameRing".format(name))
+            layout = json.loads(bytes(self._shm.buf[len(_MAGIC) + 4:len(_MAGIC) + 4 + size]).decode('utf-8'))
+        else:
+            if nb_slots < 2:
+                raise ValueError("a SharedFrameRing needs at least 2 slots")
+            layout = self._layout(outputs, nb_slots, nb_readers)
+            self._shm = shared_memory.SharedMemory(name = name, create = True, size = layout['size'])
+            self._owner = True
+            desc = json.dumps(layout).encode('utf-8')
+            if len(_MAGIC) + 4 + len(desc) > _CONTROL_OFFSET:
+                raise ValueError("too many outputs")
+            self._shm.buf[:len(_MAGIC)] = _MAGIC
+            struct.pack_into('<I', self._shm.buf, len(_MAGIC), len(desc))
+            self._shm.buf[len(_MAGIC) + 4:len(_MAGIC) + 4 + len(desc)] = desc
+
+        self.name = self._shm.name
+        self.nb_slots = layout['nb_slots']
+        self.nb_readers = layout['nb_readers']
+        buf = self._shm.buf
+        # Number of frames written, positions of the readers
+        self._write_seq = np.ndarray((1,), dtype='<u8', buffer=buf, offset=_CONTROL_OFFSET)
+        self._reader_pos = np.ndarray((self.nb_readers,), dtype='<u8', buffer=buf, offset=_CONTROL_OFFSET + 8)
+        self._headers = np.ndarray((self.nb_slots,), dtype=_SLOT_HEADER, buffer=buf, offset=layout['headers'])
+        self._arrays = [{name: np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=buf, offset=offset + k * layout['slot_size'])
+                         for name, shape, dtype, offset in layout['outputs']}
+                        for k in range(self.nb_slots)]
+        if self._owner:
+            self._write_seq[0] = 0
+            self._reader_pos[:] = _INACTIVE
+            self._headers['seq'] = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def outputs(self):
+        """
+        | Return the names of the outputs of each frame.
+        """
+        return list(self._arrays[0].keys())
+
+    def close(self):
+        """
+        | Detach from the shared memory, which is destroyed if this process created it.
+        | Arrays of the frames read from the ring must not be used anymore.
+        """
+        if self._shm is None:
+            return
+        self._write_seq = self._reader_pos = self._headers = None
+        self._arrays = []
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def beginWrite(self, timeout = None, wait_readers = True):
+        """
+        | Start writing the next frame: return its arrays (a dict indexed by output), to be filled before calling endWrite.
+        | Waits (at most 'timeout' seconds, TimeoutError after that) for the readers to release the slot of the frame,
+        | unless wait_readers is False.
+        """
+        n = int(self._write_seq[0])
+        if wait_readers:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                active = self._reader_pos[self._reader_pos != _INACTIVE]
+                if len(active) == 0 or int(active.min()) + self.nb_slots > n:
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError("readers still hold frame {}".format(n - self.nb_slots))
+                time.sleep(_POLL_PERIOD)
+        header = self._headers[n % self.nb_slots]
+        header['seq'] = 2 * n + 1
+        return self._arrays[n % self.nb_slots]
+
+    def endWrite(self, frame_index = -1, pose = None, integration_time = math.nan):
+        """
+        | Publish the frame started by beginWrite with its metadata.
+        | pose is the position and the attitude quaternion (7 values), NaN when not given.
+        """
+        n = int(self._write_seq[0])
+        header = self._headers[n % self.nb_slots]
+        header['frame_index'] = frame_index
+        header['pose'] = math.nan if pose is None else np.asarray(pose, dtype=np.float64).reshape(7)
+        header['integration_time'] = integration_time
+        header['seq'] = 2 * n + 2
+        self._write_seq[0] = n + 1
+
+    def writeFrame(self, client, frame_index = -1, pose = None, integration_time = math.nan, timeout = None, wait_readers = True):
+        """
+        | Write the outputs of the last image rendered by 'client' in the next frame of the ring (see beginWrite).
+        | Each output is read with its getter directly into the shared memory.
+        """
+        arrays = self.beginWrite(timeout, wait_readers)
+        for name, array in arrays.items():
+            getattr(client, name)(out = array)
+        self.endWrite(frame_index, pose, integration_time)
+
+    def reader(self, reader_id):
+        """
+        | Return a FrameReader reading the frames written from now on.
+        | reader_id identifies the reader in [0, nb_readers[, it is given by the application: two readers
+        | using the same id at the same time would release each other's frames.
+        """
+        if not 0 <= reader_id < self.nb_readers:
+            raise ValueError("reader_id must be in [0, {}[".format(self.nb_readers))
+        return FrameReader(self, reader_id)
+
+    # Shared memory layout: JSON-serializable description
+    def _layout(self, outputs, nb_slots, nb_readers):
+        headers = _align(_CONTROL_OFFSET + 8 * (1 + nb_readers))
+        offset = 0
+        entries = []
+        for name, (shape, dtype) in outputs.items():
+            dtype = np.dtype(dtype)
+            shape = [int(d) for d in np.atleast_1d(shape)]
+            entries.append([name, shape, dtype.str, offset])
+            offset = _align(offset + int(np.prod(shape)) * dtype.itemsize)
+        slots = _align(headers + nb_slots * _SLOT_HEADER.itemsize)
+        for entry in entries:
+            entry[3] += slots
+        return { 'nb_slots' : nb_slots, 'nb_readers' : nb_readers, 'headers' : headers, 'slot_size' : offset,
+                 'outputs' : entries, 'size' : slots + nb_slots * offset }
+
+    def _attach(self, name):
+        if sys.version_info >= (3, 13):
+            return shared_memory.SharedMemory(name = name, track = False)
+        # Before Python 3.13 attaching registers the segment to the resource tracker, which destroys it when the processes
+        # using the tracker exit. Processes started by multiprocessing share the tracker of their parent, others have their own.
+        shm = shared_memory.SharedMemory(name = name)
+        if multiprocessing.parent_process() is None:
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        return shm
+
+
+class SharedFrame:
+    """
+    | Frame of a SharedFrameRing returned by FrameReader.next: frame["getImage"] is an array mapped on the shared memory.
+    | 'seq' is the number of the frame in the ring, frame_index, pose and integration_time its metadata.
+    """
+    def __init__(self, ring, seq):
+        self._ring = ring
+        self.seq = seq
+        header = ring._headers[seq % ring.nb_slots]
+        self.frame_index = int(header['frame_index'])
+        self.pose = np.array(header['pose'])
+        self.integration_time = float(header['integration_time'])
+        self._arrays = ring._arrays[seq % ring.nb_slots]
+
+    def __getitem__(self, name):
+        return self._arrays[name]
+
+    def keys(self):
+        return self._arrays.keys()
+
+    def valid(self):
+        """
+        | Return False if the frame has been (or is being) overwritten, which only happens when the writer doesn't wait for the readers.
+        """
+        return int(self._ring._headers[self.seq % self._ring.nb_slots]['seq']) == 2 * self.seq + 2
+
+
+class FrameReader:
+    """
+    | Reader of a SharedFrameRing (see SharedFrameRing.reader).
+    """
+    def __init__(self, ring, reader_id):
+        self._ring = ring
+        self._id = reader_id
+        self._pos = int(ring._write_seq[0])
+        self._holding = False
+        ring._reader_pos[reader_id] = self._pos
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def next(self, timeout = None):
+        """
+        | Release the frame returned by the previous call and return the next one (a SharedFrame), waiting for it
+        | at most 'timeout' seconds (TimeoutError after that).
+        | If the writer doesn't wait for the readers, frames overwritten before being read are skipped.
+        """
+        ring = self._ring
+        if self._holding:
+            self._pos += 1
+            self._holding = False
+            ring._reader_pos[self._id] = self._pos
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            written = int(ring._write_seq[0])
+            # Oldest frame still in the ring, unless the writer has started overwriting it (checked by valid())
+            if self._pos < written - ring.nb_slots:
+                self._pos = written - ring.nb_slots
+                ring._reader_pos[self._id] = self._pos
+            if self._pos < written:
+                frame = SharedFrame(ring, self._pos)
+                if frame.valid():
+                    self._holding = True
+                    return frame
+                # Being overwritten: skipped once the writer publishes the frame replacing it
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("no new frame")
+            time.sleep(_POLL_PERIOD)
+
+    def close(self):
+        """
+        | Release the frame held and unregister the reader.
+        """
+        if self._ring is not None and self._ring._reader_pos is not None:
+            self._ring._reader_pos[self._id] = _INACTIVE
+        self._ring = None
@@ -19,8 +19,7 @@ class surrender_client(surrender_client_base):
         params["texture_unit_id"] = int(texture_unit_id);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("attachDynamicTexture");
+        return self._post("attachDynamicTexture");
 
     def cd(self, path):
         """
@@ -32,8 +31,7 @@ class surrender_client(surrender_client_base):
         params["path"] = str(path);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("cd");
+        return self._post("cd");
 
     def clearMetadata(self):
         """
@@ -43,8 +41,7 @@ class surrender_client(surrender_client_base):
         params = { "" : "clearMetadata"};
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("clearMetadata");
+        return self._post("clearMetadata");
 
     def createBRDF(self, name, filename, parameters):
         """
@@ -58,8 +55,7 @@ class surrender_client(surrender_client_base):
         params["parameters"] = parameters;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("createBRDF");
+        return self._post("createBRDF");
 
     def createBody(self, body_name, shape_name, brdf_name, textures):
         """
@@ -78,8 +74,7 @@ class surrender_client(surrender_client_base):
         params["textures"] = textures;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("createBody");
+        return self._post("createBody");
 
     def createDEM(self, object_name, conemap_filename, brdf_name, texture):
         """
@@ -113,8 +108,7 @@ class surrender_client(surrender_client_base):
         params["exponent"] = float(exponent);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("createLight");
+        return self._post("createLight");
 
     def createMesh(self, object_name, model_name, scale):
         """
@@ -130,8 +124,7 @@ class surrender_client(surrender_client_base):
         params["scale"] = float(scale);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("createMesh");
+        return self._post("createMesh");
 
     def createPerPixelProcess(self, name, filename, parameters):
         """
@@ -146,8 +139,7 @@ class surrender_client(surrender_client_base):
         params["parameters"] = parameters;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("createPerPixelProcess");
+        return self._post("createPerPixelProcess");
 
     def createShape(self, name, filename, parameters):
         """
@@ -161,8 +153,7 @@ class surrender_client(surrender_client_base):
         params["parameters"] = parameters;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("createShape");
+        return self._post("createShape");
 
     def createSphericalDEM(self, object_name, conemap_filename, brdf_name, texture):
         """
@@ -195,8 +186,7 @@ class surrender_client(surrender_client_base):
         params["gray"] = bool(gray);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("createUserDataTexture");
+        return self._post("createUserDataTexture");
 
     def createVideoTexture(self, name, filename, loop):
         """
@@ -210,8 +200,7 @@ class surrender_client(surrender_client_base):
         params["loop"] = bool(loop);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("createVideoTexture");
+        return self._post("createVideoTexture");
 
     def dumpPhotonMapToFile(self, object_name, filename):
         """
@@ -223,8 +212,7 @@ class surrender_client(surrender_client_base):
         params["filename"] = str(filename);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("dumpPhotonMapToFile");
+        return self._post("dumpPhotonMapToFile");
 
     def enableAutoUpdate(self, enable):
         """
@@ -236,8 +224,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableAutoUpdate");
+        return self._post("enableAutoUpdate");
 
     def enableDoublePrecisionMode(self, *args, **kwargs):
         """
@@ -275,8 +262,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableGlobalDynamicShadowMap");
+        return self._post("enableGlobalDynamicShadowMap");
 
     def enableIrradianceMode(self, enable):
         """
@@ -287,8 +273,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableIrradianceMode");
+        return self._post("enableIrradianceMode");
 
     def enableLOSmapping(self, b_enable):
         """
@@ -301,8 +286,7 @@ class surrender_client(surrender_client_base):
         params["b_enable"] = bool(b_enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableLOSmapping");
+        return self._post("enableLOSmapping");
 
     def enableMultilateralFiltering(self, *args, **kwargs):
         """
@@ -326,8 +310,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enablePathTracing");
+        return self._post("enablePathTracing");
 
     def enablePhotonAccumulation(self, enable):
         """
@@ -340,8 +323,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enablePhotonAccumulation");
+        return self._post("enablePhotonAccumulation");
 
     def enablePreviewMode(self, enable):
         """
@@ -353,8 +335,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enablePreviewMode");
+        return self._post("enablePreviewMode");
 
     def enableRaySharing(self, enable):
         """
@@ -367,8 +348,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableRaySharing");
+        return self._post("enableRaySharing");
 
     def enableRaytracing(self, enable):
         """
@@ -379,8 +359,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableRaytracing");
+        return self._post("enableRaytracing");
 
     def enableRegularPSFSampling(self, enable):
         """
@@ -391,8 +370,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableRegularPSFSampling");
+        return self._post("enableRegularPSFSampling");
 
     def enableRegularPixelSampling(self, enable):
         """
@@ -403,8 +381,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableRegularPixelSampling");
+        return self._post("enableRegularPixelSampling");
 
     def enableScanningDeviceMode(self, enable):
         """
@@ -421,8 +398,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableScanningDeviceMode");
+        return self._post("enableScanningDeviceMode");
 
     def enableSkipPixelSampling(self, enable):
         """
@@ -435,8 +411,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableSkipPixelSampling");
+        return self._post("enableSkipPixelSampling");
 
     def enableSpecularOptimization(self, enable):
         """
@@ -447,8 +422,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableSpecularOptimization");
+        return self._post("enableSpecularOptimization");
 
     def enableTimeMapping(self, b_enable):
         """
@@ -461,8 +435,7 @@ class surrender_client(surrender_client_base):
         params["b_enable"] = bool(b_enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("enableTimeMapping");
+        return self._post("enableTimeMapping");
 
     def exists(self, object_name):
         """
@@ -914,8 +887,7 @@ class surrender_client(surrender_client_base):
         params["offset_ratio"] = float(offset_ratio);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("loadAndProjectMultipleMeshes");
+        return self._post("loadAndProjectMultipleMeshes");
 
     def loadMotionModel(self, filename, parameters):
         """
@@ -928,8 +900,7 @@ class surrender_client(surrender_client_base):
         params["parameters"] = parameters;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("loadMotionModel");
+        return self._post("loadMotionModel");
 
     def loadMultipleMeshes(self, object_name, mesh_names, positions, attitudes):
         """
@@ -944,8 +915,7 @@ class surrender_client(surrender_client_base):
         params["attitudes"] = attitudes;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("loadMultipleMeshes");
+        return self._post("loadMultipleMeshes");
 
     def loadPSFModel(self, filename, parameters):
         """
@@ -958,8 +928,7 @@ class surrender_client(surrender_client_base):
         params["parameters"] = parameters;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("loadPSFModel");
+        return self._post("loadPSFModel");
 
     def loadProjectionModel(self, filename, parameters):
         """
@@ -972,8 +941,7 @@ class surrender_client(surrender_client_base):
         params["parameters"] = parameters;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("loadProjectionModel");
+        return self._post("loadProjectionModel");
 
     def loadSpectrumModel(self, filename, parameters):
         """
@@ -987,8 +955,7 @@ class surrender_client(surrender_client_base):
         params["parameters"] = parameters;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("loadSpectrumModel");
+        return self._post("loadSpectrumModel");
 
     def loadTextureObject(self, name, filename, parameters):
         """
@@ -1003,8 +970,7 @@ class surrender_client(surrender_client_base):
         params["parameters"] = parameters;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("loadTextureObject");
+        return self._post("loadTextureObject");
 
     def loadTimeSamplingModel(self, filename, parameters):
         """
@@ -1017,8 +983,7 @@ class surrender_client(surrender_client_base):
         params["parameters"] = parameters;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("loadTimeSamplingModel");
+        return self._post("loadTimeSamplingModel");
 
     def ls(self):
         """
@@ -1092,8 +1057,7 @@ class surrender_client(surrender_client_base):
         params = { "" : "render"};
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("render");
+        return self._post("render");
 
     def renderMicroTasks(self, utasks):
         """
@@ -1108,8 +1072,7 @@ class surrender_client(surrender_client_base):
         params["utasks"] = utasks;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("renderMicroTasks");
+        return self._post("renderMicroTasks");
 
     def reset(self):
         """
@@ -1120,8 +1083,7 @@ class surrender_client(surrender_client_base):
         params = { "" : "reset"};
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("reset");
+        return self._post("reset");
 
     def runPerPixelProcess(self, output_name, process_name):
         """
@@ -1135,8 +1097,7 @@ class surrender_client(surrender_client_base):
         params["process_name"] = str(process_name);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("runPerPixelProcess");
+        return self._post("runPerPixelProcess");
 
     def saveDepthMap(self, filename):
         """
@@ -1147,8 +1108,7 @@ class surrender_client(surrender_client_base):
         params["filename"] = str(filename);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("saveDepthMap");
+        return self._post("saveDepthMap");
 
     def saveImage(self, filename):
         """
@@ -1160,8 +1120,7 @@ class surrender_client(surrender_client_base):
         params["filename"] = str(filename);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("saveImage");
+        return self._post("saveImage");
 
     def saveImageGray32F(self, filename):
         """
@@ -1173,8 +1132,7 @@ class surrender_client(surrender_client_base):
         params["filename"] = str(filename);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("saveImageGray32F");
+        return self._post("saveImageGray32F");
 
     def saveImageGray8(self, filename):
         """
@@ -1186,8 +1144,7 @@ class surrender_client(surrender_client_base):
         params["filename"] = str(filename);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("saveImageGray8");
+        return self._post("saveImageGray8");
 
     def saveImageRGB8(self, filename):
         """
@@ -1199,8 +1156,7 @@ class surrender_client(surrender_client_base):
         params["filename"] = str(filename);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("saveImageRGB8");
+        return self._post("saveImageRGB8");
 
     def saveImageSpectrumProjection(self, filename, spectrum):
         """
@@ -1213,8 +1169,7 @@ class surrender_client(surrender_client_base):
         params["spectrum"] = self._vec(spectrum);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("saveImageSpectrumProjection");
+        return self._post("saveImageSpectrumProjection");
 
     def saveImageSpectrumProjectionQuantized(self, filename, spectrum, nbits):
         """
@@ -1229,8 +1184,7 @@ class surrender_client(surrender_client_base):
         params["nbits"] = int(nbits);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("saveImageSpectrumProjectionQuantized");
+        return self._post("saveImageSpectrumProjectionQuantized");
 
     def saveObject(self, object_name, filename):
         """
@@ -1242,8 +1196,7 @@ class surrender_client(surrender_client_base):
         params["filename"] = str(filename);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("saveObject");
+        return self._post("saveObject");
 
     def setAlias(self, object_name, alias):
         """
@@ -1255,8 +1208,7 @@ class surrender_client(surrender_client_base):
         params["alias"] = str(alias);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setAlias");
+        return self._post("setAlias");
 
     def setBackground(self, background):
         """
@@ -1267,8 +1219,7 @@ class surrender_client(surrender_client_base):
         params["background"] = str(background);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setBackground");
+        return self._post("setBackground");
 
     def setCameraFOVDeg(self, fov_x, fov_y):
         """
@@ -1280,8 +1231,7 @@ class surrender_client(surrender_client_base):
         params["fov_y"] = float(fov_y);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setCameraFOVDeg");
+        return self._post("setCameraFOVDeg");
 
     def setCameraFOVRad(self, fov_x, fov_y):
         """
@@ -1293,8 +1243,7 @@ class surrender_client(surrender_client_base):
         params["fov_y"] = float(fov_y);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setCameraFOVRad");
+        return self._post("setCameraFOVRad");
 
     def setConventions(self, quaternion_convention, camera_convention):
         """
@@ -1306,8 +1255,7 @@ class surrender_client(surrender_client_base):
         params["camera_convention"] = int(camera_convention);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setConventions");
+        return self._post("setConventions");
 
     def setCubeMapSize(self, cube_map_size):
         """
@@ -1318,8 +1266,7 @@ class surrender_client(surrender_client_base):
         params["cube_map_size"] = cube_map_size;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setCubeMapSize");
+        return self._post("setCubeMapSize");
 
     def setCubeMapZNear(self, znear):
         """
@@ -1330,8 +1277,7 @@ class surrender_client(surrender_client_base):
         params["znear"] = float(znear);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setCubeMapZNear");
+        return self._post("setCubeMapZNear");
 
     def setFSAA(self, fsaa):
         """
@@ -1344,8 +1290,7 @@ class surrender_client(surrender_client_base):
         params["fsaa"] = int(fsaa);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setFSAA");
+        return self._post("setFSAA");
 
     def setFocus(self, focus_plane_Z, pupil_radius):
         """
@@ -1360,8 +1305,7 @@ class surrender_client(surrender_client_base):
         params["pupil_radius"] = float(pupil_radius);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setFocus");
+        return self._post("setFocus");
 
     def setGlobalVariables(self, names_and_values):
         """
@@ -1373,8 +1317,7 @@ class surrender_client(surrender_client_base):
         params["names_and_values"] = names_and_values;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setGlobalVariables");
+        return self._post("setGlobalVariables");
 
     def setImageSize(self, width, height):
         """
@@ -1386,8 +1329,7 @@ class surrender_client(surrender_client_base):
         params["height"] = height;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setImageSize");
+        return self._post("setImageSize");
 
     def setIntegrationTime(self, integration_time):
         """
@@ -1399,8 +1341,7 @@ class surrender_client(surrender_client_base):
         params["integration_time"] = float(integration_time);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setIntegrationTime");
+        return self._post("setIntegrationTime");
 
     def setMaxSamplesPerPixel(self, max_samples):
         """
@@ -1411,8 +1352,7 @@ class surrender_client(surrender_client_base):
         params["max_samples"] = int(max_samples);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setMaxSamplesPerPixel");
+        return self._post("setMaxSamplesPerPixel");
 
     def setMaxSecondaryRays(self, max_secondary_rays):
         """
@@ -1423,8 +1363,7 @@ class surrender_client(surrender_client_base):
         params["max_secondary_rays"] = int(max_secondary_rays);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setMaxSecondaryRays");
+        return self._post("setMaxSecondaryRays");
 
     def setMaxShadowRays(self, max_shadow_rays):
         """
@@ -1436,8 +1375,7 @@ class surrender_client(surrender_client_base):
         params["max_shadow_rays"] = int(max_shadow_rays);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setMaxShadowRays");
+        return self._post("setMaxShadowRays");
 
     def setMetadata(self, name, value):
         """
@@ -1451,8 +1389,7 @@ class surrender_client(surrender_client_base):
         params["value"] = value;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setMetadata");
+        return self._post("setMetadata");
 
     def setNbSamplesPerPixel(self, nb_samples):
         """
@@ -1463,8 +1400,7 @@ class surrender_client(surrender_client_base):
         params["nb_samples"] = int(nb_samples);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setNbSamplesPerPixel");
+        return self._post("setNbSamplesPerPixel");
 
     def setNearPlane(self, z):
         """
@@ -1475,8 +1411,7 @@ class surrender_client(surrender_client_base):
         params["z"] = float(z);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setNearPlane");
+        return self._post("setNearPlane");
 
     def setObjectAttitude(self, object_name, attitude):
         """
@@ -1489,8 +1424,7 @@ class surrender_client(surrender_client_base):
         params["attitude"] = self._vec(attitude);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setObjectAttitude");
+        return self._post("setObjectAttitude");
 
     def setObjectDynamicCubeMap(self, object_name, enable):
         """
@@ -1504,8 +1438,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setObjectDynamicCubeMap");
+        return self._post("setObjectDynamicCubeMap");
 
     def setObjectDynamicShadowMap(self, object_name, enable):
         """
@@ -1519,8 +1452,7 @@ class surrender_client(surrender_client_base):
         params["enable"] = bool(enable);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setObjectDynamicShadowMap");
+        return self._post("setObjectDynamicShadowMap");
 
     def setObjectElementBRDF(self, object_name, element_name, brdf):
         """
@@ -1534,8 +1466,7 @@ class surrender_client(surrender_client_base):
         params["brdf"] = str(brdf);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setObjectElementBRDF");
+        return self._post("setObjectElementBRDF");
 
     def setObjectElementProperty(self, name, element_name, property, value):
         """
@@ -1553,8 +1484,7 @@ class surrender_client(surrender_client_base):
         params["value"] = float(value);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setObjectElementProperty");
+        return self._post("setObjectElementProperty");
 
     def setObjectElementTransform(self, object_name, element_name, matrix, relative):
         """
@@ -1569,8 +1499,7 @@ class surrender_client(surrender_client_base):
         params["relative"] = bool(relative);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setObjectElementTransform");
+        return self._post("setObjectElementTransform");
 
     def setObjectMotion(self, object_name, motion):
         """
@@ -1582,8 +1511,7 @@ class surrender_client(surrender_client_base):
         params["motion"] = [ self._vec(motion[0]), self._vec(motion[1]) ];
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setObjectMotion");
+        return self._post("setObjectMotion");
 
     def setObjectPosition(self, object_name, pos):
         """
@@ -1596,8 +1524,7 @@ class surrender_client(surrender_client_base):
         params["pos"] = self._vec(pos);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setObjectPosition");
+        return self._post("setObjectPosition");
 
     def setObjectProperty(self, name, property, value):
         """
@@ -1614,8 +1541,7 @@ class surrender_client(surrender_client_base):
         params["value"] = float(value);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setObjectProperty");
+        return self._post("setObjectProperty");
 
     def setObjectSamples(self, object_name, nb_samples):
         """
@@ -1628,8 +1554,7 @@ class surrender_client(surrender_client_base):
         params["nb_samples"] = float(nb_samples);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setObjectSamples");
+        return self._post("setObjectSamples");
 
     def setPSFSigma(self, sigma):
         """
@@ -1641,8 +1566,7 @@ class surrender_client(surrender_client_base):
         params["sigma"] = float(sigma);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setPSFSigma");
+        return self._post("setPSFSigma");
 
     def setPhotonMapSamplingStep(self, step):
         """
@@ -1654,8 +1578,7 @@ class surrender_client(surrender_client_base):
         params["step"] = float(step);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setPhotonMapSamplingStep");
+        return self._post("setPhotonMapSamplingStep");
 
     def setRessourcePath(self, ressource_path):
         """
@@ -1666,8 +1589,7 @@ class surrender_client(surrender_client_base):
         params["ressource_path"] = str(ressource_path);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setRessourcePath");
+        return self._post("setRessourcePath");
 
     def setSelfVisibilitySamplingStep(self, step):
         """
@@ -1679,8 +1601,7 @@ class surrender_client(surrender_client_base):
         params["step"] = float(step);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setSelfVisibilitySamplingStep");
+        return self._post("setSelfVisibilitySamplingStep");
 
     def setShadowMapSize(self, shadow_map_size):
         """
@@ -1691,8 +1612,7 @@ class surrender_client(surrender_client_base):
         params["shadow_map_size"] = shadow_map_size;
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setShadowMapSize");
+        return self._post("setShadowMapSize");
 
     def setStarThreshold(self, threshold):
         """
@@ -1708,8 +1628,7 @@ class surrender_client(surrender_client_base):
         params["threshold"] = float(threshold);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setStarThreshold");
+        return self._post("setStarThreshold");
 
     def setState(self, state):
         """
@@ -1722,8 +1641,7 @@ class surrender_client(surrender_client_base):
         params["state"] = str(state);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setState");
+        return self._post("setState");
 
     def setSunPower(self, sun_color):
         """
@@ -1735,8 +1653,7 @@ class surrender_client(surrender_client_base):
         params["sun_color"] = self._vec(sun_color);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setSunPower");
+        return self._post("setSunPower");
 
     def setSunPowerAtDistance(self, sun_color, distance):
         """
@@ -1749,8 +1666,7 @@ class surrender_client(surrender_client_base):
         params["distance"] = float(distance);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("setSunPowerAtDistance");
+        return self._post("setSunPowerAtDistance");
 
     def updateDisplay(self):
         """
@@ -1761,8 +1677,7 @@ class surrender_client(surrender_client_base):
         params = { "" : "updateDisplay"};
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("updateDisplay");
+        return self._post("updateDisplay");
 
     def updateDynamicTexture(self, name):
         """
@@ -1773,8 +1688,7 @@ class surrender_client(surrender_client_base):
         params["name"] = str(name);
         self._stream.writeQVariantHash(params);
         self._flush(True);
-        if not self._async:
-            ret = self._read_return("updateDynamicTexture");
+        return self._post("updateDynamicTexture");
 
     def version(self):
         """
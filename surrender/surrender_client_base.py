@@ -6,12 +6,44 @@ Created on Fri Jun  8 15:42:57 2018
 @author: brochard
 """
 
+import collections
+import contextlib
 import numpy as np
 import os
 import socket
 import struct
 import zlib
 from hashlib import md5
+from surrender.command_batch import CommandBatch
+from surrender.command_future import CommandFuture
+from surrender.frame import Frame
+from surrender.lazy_image import LazyImage
+from surrender.payload_inflater import PayloadInflater, _shared_executor
+from surrender import micro_tasks
+from surrender.qvariant import QVariantEncoder, QVariantDecoder, PayloadSink
+
+
+# Receives a payload in the array 'out' given to an image getter only if it is an image of its shape: the payload must
+# have exactly the size of the array, and the width and height of the reply must match if they come before it.
+# Other payloads are received apart so that the array is left untouched.
+class _OutputPayload(PayloadSink):
+    def __init__(self, out):
+        self._out = out
+        self._view = memoryview(out).cast('B')
+        self._received = None
+
+    def begin(self, fields):
+        if fields.get("w", self._out.shape[1]) != self._out.shape[1] or fields.get("h", self._out.shape[0]) != self._out.shape[0]:
+            self._view = None
+
+    def open(self, size):
+        fits = self._view is not None and size == len(self._view)
+        self._received = self._view if fits else memoryview(bytearray(size))
+        return self._received
+
+    def close(self):
+        return self._received
+
 
 class surrender_client_base:
     XYZ_SCALAR_CONVENTION = 0;
@@ -31,6 +63,27 @@ class surrender_client_base:
     _DT_String = 10;
     _DT_ByteArray = 12;
     _DT_Hash = 28;
+
+    # Replies of the image getters: payload key, element type, number of channels,
+    # None returned for empty images, bytes of the elements stored in planes when compressed
+    _IMAGE_REPLIES = {
+        "getImage" : ("image_data", np.float32, 4, False, False),
+        "getImageRGBA8" : ("image_data", np.uint8, 4, False, False),
+        "getImageGray32F" : ("image_data", np.float32, 1, False, False),
+        "getImageGray8" : ("image_data", np.uint8, 1, False, False),
+        "getImageSpectrumProjection" : ("image_data", np.float32, 1, False, True),
+        "getDepthMap" : ("depth_data", np.float64, 1, False, False),
+        "getNormalMap" : ("normal_data", np.float32, 3, False, False),
+        "getLOSMap" : ("los_data", np.float32, 3, True, False),
+        "getTimeMap" : ("time_data", np.float32, 1, True, False),
+    };
+
+    # Commands changing the µtasks of an image (camera model, image size, pixel sampling): they invalidate the µtasks cached by renderROI
+    _MICRO_TASKS_INVALIDATORS = frozenset([
+        "setImageSize", "setCameraFOVDeg", "setCameraFOVRad", "loadProjectionModel", "setConventions",
+        "enableRaytracing", "setNbSamplesPerPixel", "setMaxSamplesPerPixel", "enableRegularPixelSampling",
+        "enableSkipPixelSampling", "enableRegularPSFSampling", "loadTimeSamplingModel", "reset",
+    ]);
     
    
     def __init__(self):
@@ -45,6 +98,29 @@ class surrender_client_base:
         self._exception_on_error = True;
         self._exception_on_warning = False;
 
+        # Outgoing messages are serialized in the encoder buffer and sent by _flush
+        self._encoder = QVariantEncoder();
+        self._write_buffer_size = 1 << 20;
+
+        # Incoming data is read by large chunks and decoded from the decoder buffer
+        self._decoder = QVariantDecoder(self._sock_recv, self._sock_recv_into);
+
+        self._frame_pool = None;
+        # Getters return LazyImages (see setLazyImages)
+        self._lazy_images = False;
+        # Compression level set by setCompressionLevel, None if unknown (the server chooses a default)
+        self._compression_level = None;
+
+        # Commands sent in asynchronous mode waiting for their acknowledgement (oldest first)
+        self._pending = collections.deque();
+        self._max_pending = 256;
+        # Failed commands whose error has not been retrieved yet
+        self._failed = [];
+        # Commands recorded by batch()
+        self._batch = None;
+        # µtasks of the full image sorted by row and their rows, cached by renderROI
+        self._micro_tasks = None;
+
         # This is temporary
         self._stream = self;
         
@@ -66,6 +142,12 @@ class surrender_client_base:
         if self._sock:
             self._sock.close();
             self._sock = None;
+        self._encoder.reset();
+        self._decoder.reset();
+        self._fail_pending(RuntimeError("Connection closed"));
+        self._failed = [];
+        self._micro_tasks = None;
+        self._compression_level = None;
 
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, 0);
         if self._sock == -1 or self._sock == None:
@@ -84,134 +166,74 @@ class surrender_client_base:
                 raise RuntimeError(msg);
             return;
 
-    def getImage(self):
+    def getImage(self, out = None):
         """
         Return the last generated image with its 4 channels in float.
         The unit of the returned values depend on the effect enabled for rendering.
+        If given, 'out' is a (height, width, 4) float32 array in which the image is written.
         """
         self._check_connection();
         self._stream.writeQVariantHash({ "" : "getImage" });
         self._flush(True);
-        ret = self._read_return("getImage");
-
-        w32 = ret["w"];
-        h32 = ret["h"];
-
-        if ret["compressed"]:
-            _buf = self._uncompress(ret["image_data"]);
-        else:
-            _buf = ret["image_data"];
+        return self._read_image_return("getImage", out);
 
-        return np.flipud(np.frombuffer(_buf, dtype=np.float32).reshape(h32, w32, 4));
-        
-    def getImageRGBA8(self):
+    def getImageRGBA8(self, out = None):
         """
         Return the last generated image with its 4 channels in 8bits.
+        If given, 'out' is a (height, width, 4) uint8 array in which the image is written.
         """
         self._check_connection();
         self._stream.writeQVariantHash({ "" : "getImageRGBA8" });
         self._flush(True);
-        ret = self._read_return("getImageRGBA8");
-
-        w32 = ret["w"];
-        h32 = ret["h"];
-
-        if ret["compressed"]:
-            _buf = self._uncompress(ret["image_data"]);
-        else:
-            _buf = ret["image_data"];
+        return self._read_image_return("getImageRGBA8", out);
 
-        return np.flipud(np.frombuffer(_buf, dtype=np.uint8).reshape(h32, w32, 4));
-
-    def getDepthMap(self):
+    def getDepthMap(self, out = None):
         """
         | Return the depth map of the last rendererd image in double precision.
         | NB: if PSF is enabled or if more than 1 ray is cast per pixel then this is likely to be meaningless.
+        | If given, 'out' is a (height, width) float64 array in which the depth map is written.
         """
         self._check_connection();
         self._stream.writeQVariantHash({ "" : "getDepthMap" });
         self._flush(True);
-        ret = self._read_return("getDepthMap");
-
-        w32 = ret["w"];
-        h32 = ret["h"];
+        return self._read_image_return("getDepthMap", out);
 
-        if ret["compressed"]:
-            _buf = self._uncompress(ret["depth_data"]);
-        else:
-            _buf = ret["depth_data"];
-
-        return np.flipud(np.frombuffer(_buf, dtype=np.float64).reshape(h32, w32));
-        
-    def getNormalMap(self):
+    def getNormalMap(self, out = None):
         """
         | Return the normal map of the last rendererd image in single precision.
         | NB: if PSF is enabled or if more than 1 ray is cast per pixel then this is likely to be meaningless.
+        | If given, 'out' is a (height, width, 3) float32 array in which the normal map is written.
         """
         self._check_connection();
         self._stream.writeQVariantHash({ "" : "getNormalMap" });
         self._flush(True);
-        ret = self._read_return("getNormalMap");
+        return self._read_image_return("getNormalMap", out);
 
-        w32 = ret["w"];
-        h32 = ret["h"];
-
-        if ret["compressed"]:
-            _buf = self._uncompress(ret["normal_data"]);
-        else:
-            _buf = ret["normal_data"];
-
-        return np.flipud(np.frombuffer(_buf, dtype=np.float32).reshape(h32, w32, 3));
-
-    def getLOSMap(self):
+    def getLOSMap(self, out = None):
         """
         | Returns the LOS map of the last raytraced image in single precision.
         | Each pixel is a 3D vector containing the average LOS for each simulated pixel.
         | 'Empty' pixels (pixels we don't bother to scan because we known there is nothing or
         | because pixel integration time is 0) will be set to (0,0,0).
+        | If given, 'out' is a (height, width, 3) float32 array in which the LOS map is written.
         """
         self._check_connection();
         self._stream.writeQVariantHash({ "" : "getLOSMap" });
         self._flush(True);
-        ret = self._read_return("getLOSMap");
-
-        w32 = ret["w"];
-        h32 = ret["h"];
-        
-        if w32 * h32 == 0:
-            return None
-
-        if ret["compressed"]:
-            _buf = self._uncompress(ret["los_data"]);
-        else:
-            _buf = ret["los_data"];
+        return self._read_image_return("getLOSMap", out);
 
-        return np.flipud(np.frombuffer(_buf, dtype=np.float32).reshape(h32, w32, 3));
-
-    def getTimeMap(self):
+    def getTimeMap(self, out = None):
         """
         | Returns the time map of the last raytraced image in single precision.
         | Each pixel is a float containing the average time for each simulated pixel.
         | 'Empty' pixels (pixels we don't bother to scan because we known there is nothing or
         | because pixel integration time is 0) will be set to NaN.
+        | If given, 'out' is a (height, width) float32 array in which the time map is written.
         """
         self._check_connection();
         self._stream.writeQVariantHash({ "" : "getTimeMap" });
         self._flush(True);
-        ret = self._read_return("getTimeMap");
-
-        w32 = ret["w"];
-        h32 = ret["h"];
-        
-        if w32 * h32 == 0:
-            return None
-
-        if ret["compressed"]:
-            _buf = self._uncompress(ret["time_data"]);
-        else:
-            _buf = ret["time_data"];
-
-        return np.flipud(np.frombuffer(_buf, dtype=np.float32).reshape(h32, w32));
+        return self._read_image_return("getTimeMap", out);
 
     def closeViewer(self):
         """
@@ -233,44 +255,27 @@ class surrender_client_base:
         self._stream.writeQVariantHash(params);
         self._flush(True);
         self._read_return("setCompressionLevel");
+        self._compression_level = int(lvl);
         
-    def getImageGray32F(self):
+    def getImageGray32F(self, out = None):
         """
         Return the last generated image as a single channel (the mean of the first 3 channels, usually RGB) in float.
+        If given, 'out' is a (height, width) float32 array in which the image is written.
         """
         self._check_connection();
         self._stream.writeQVariantHash({ "" : "getImageGray32F" });
         self._flush(True);
-        ret = self._read_return("getImageGray32F");
-
-        w32 = ret["w"];
-        h32 = ret["h"];
-
-        if ret["compressed"]:
-            _buf = self._uncompress(ret["image_data"]);
-        else:
-            _buf = ret["image_data"];
+        return self._read_image_return("getImageGray32F", out);
 
-        return np.flipud(np.frombuffer(_buf, dtype=np.float32).reshape(h32, w32));
-
-    def getImageGray8(self):
+    def getImageGray8(self, out = None):
         """
         Return the last generated image as a single channel (the mean of the first 3 channels, usually RGB) in 8bits.
+        If given, 'out' is a (height, width) uint8 array in which the image is written.
         """
         self._check_connection();
         self._stream.writeQVariantHash({ "" : "getImageGray8" });
         self._flush(True);
-        ret = self._read_return("getImageGray8");
-
-        w32 = ret["w"];
-        h32 = ret["h"];
-
-        if ret["compressed"]:
-            _buf = self._uncompress(ret["image_data"]);
-        else:
-            _buf = ret["image_data"];
-
-        return np.flipud(np.frombuffer(_buf, dtype=np.uint8).reshape(h32, w32));
+        return self._read_image_return("getImageGray8", out);
 
     def isConnected(self):
         """
@@ -283,6 +288,8 @@ class surrender_client_base:
         Run the given Lua code on the server. The Lua VM is preserved across calls so you can store values in the VM global environment.
         """
         self._check_connection();
+        # Lua code can change anything, including the camera model: cached µtasks are dropped (see renderROI)
+        self._micro_tasks = None;
         self._stream.writeQVariantHash({"" : "runLUACode",
                                        "code" : str(code) });
         self._flush(True);
@@ -295,6 +302,7 @@ class surrender_client_base:
         Run a Lua script (which should be on the server) in the Lua VM of the server.
         """
         self._check_connection();
+        self._micro_tasks = None;
         self._stream.writeQVariantHash({ "" : "runLUAScript",
                                   "filename" : str(filename) });
         self._flush(True);
@@ -310,25 +318,7 @@ class surrender_client_base:
         | compressionLevel allows enabling compression to speed up transfer (-1 means LZ4, 0 means no compression, 1-9 means zlib compression).
         """
         self._check_connection();
-        params = {
-            "name" : str(name),
-            "" : "updateUserDataTexture"
-            };
-        if compressionLevel != -2:  # Zlib compression (deflate)
-            params["data"] = self._compress(data, compressionLevel);
-        else:                       # LZ4 compression
-##ifdef LZ4_FOUND
-#            params["size"] = uint32_t(data.size() * sizeof(data.front()));
-#            params["use_lz4"] = true;
-#            QByteArray qdata = QByteArray::fromRawData((const char*)data.data(), data.size() * sizeof(data.front()));
-#            const int worst_size = LZ4_compressBound(qdata.size());
-#            QByteArray lz4_data(worst_size, Qt::Uninitialized);
-#            const int lz4_size = LZ4_compress(qdata.data(), lz4_data.data(), qdata.size());
-#            lz4_data.resize(lz4_size);
-#            params["data"] = lz4_data;
-##else
-            self._printError("LZ4 support not implemented, falling back to zlib compression level 1");
-            params["data"] = self._compress(data, 1);
+        params = self._user_data_texture_params(name, data, compressionLevel);
         self._stream.writeQVariantHash(params);
         self._flush(True);
         self._read_return("updateUserDataTexture");
@@ -347,21 +337,7 @@ class surrender_client_base:
         Set the PSF as a 2D matrix of weights with its support (or size) in pixels and a distance in samples above which samples are considered part of the tail.
         """
         self._check_connection();
-        w = psf_image.shape[1];
-        h = psf_image.shape[0];
-        
-        psf = np.array(psf_image, dtype=np.float32).tobytes();
-
-        params = {
-            "w" : int(w),
-            "h" : int(h),
-            "psf" : psf,
-            "support_w" : float(support_w),
-            "support_h" : float(support_h),
-            "blooming_threshold_distance" : int(blooming_threshold_distance),
-            "" : "setPSF"
-            };
-
+        params = self._psf_params(psf_image, support_w, support_h, blooming_threshold_distance);
         self._stream.writeQVariantHash(params);
         self._flush(True);
         self._read_return("setPSF");
@@ -380,64 +356,302 @@ class surrender_client_base:
         | PSF_tail_coef is the fraction of energy in the tail used when blending the 2 parts of the PSF.
         """
         self._check_connection();
-        w = psf_image.shape[1];
-        h = psf_image.shape[0];
-        w_tail = psf_tail_image.shape[1];
-        h_tail = psf_tail_image.shape[0];
-        
-        psf = np.array(psf_image, dtype=np.float32).tobytes();
-
-        psf_tail = np.array(psf_tail_image, dtype=np.float32).tobytes();
-
-        params = {
-            "w" : int(w),
-            "h" : int(h),
-            "psf" : psf,
-            "support_w" : float(support_w),
-            "support_h" : float(support_h),
-
-            "w_tail" : int(w_tail),
-            "h_tail" : int(h_tail),
-            "psf_tail" : psf_tail,
-            "support_w_tail" : float(support_w_tail),
-            "support_h_tail" : float(support_h_tail),
-
-            "blooming_threshold_distance" : int(0),
-            "PSF_tail_coef" : float(PSF_tail_coef),
-
-            "" : "setPSFWithTail"
-            };
-
+        params = self._psf_with_tail_params(psf_image, psf_tail_image, PSF_tail_coef, support_w, support_h, support_w_tail, support_h_tail);
         self._stream.writeQVariantHash(params);
         self._flush(True);
         self._read_return("setPSFWithTail");
 
 #        void getGMCVideo_streamRGB8(image_rgba8_t &image);
 #
-    def getImageSpectrumProjection(self, spectrum):
+    def getImageSpectrumProjection(self, spectrum, out = None):
         """
         | Return the last generated image as a single channel in float.
         | For each pixel the returned value is the projection of the pixel data along the given spectrum vector.
+        | If given, 'out' is a (height, width) float32 array in which the image is written.
         """
         self._check_connection();
         self._stream.writeQVariantHash({ "" : "getImageSpectrumProjection",
                                         "spectrum" : self._vec(spectrum) });
         self._flush(True);
-        ret = self._read_return("getImageSpectrumProjection");
+        return self._read_image_return("getImageSpectrumProjection", out);
 
-        w32 = ret["w"];
-        h32 = ret["h"];
-        
-        if ret["compressed"]:
-            _buf = self._uncompress(ret["image_data"]);
-            # Reorder bytes (splitting the 4 bytes of each float into 4 planes helps compressing data)
-            byte_planes = np.frombuffer(_buf, dtype=np.uint8).reshape(4,h32, w32);
-            img = np.frombuffer(byte_planes.transpose(1,2,0).tobytes(), dtype=np.float32).reshape(h32,w32);
-        else:
-            _buf = ret["image_data"];
-            img = np.frombuffer(_buf, dtype=np.float32).reshape(h32,w32);
+    def setFramePool(self, pool):
+        """
+        | Attach a FramePool (see surrender.frame_pool) to the image getters.
+        | When a pool is attached, getters called without 'out' write their result in arrays owned by the pool instead of allocating new ones.
+        | None detaches the pool.
+        """
+        self._frame_pool = pool;
+
+    def getFramePool(self):
+        """
+        Return the FramePool attached to the image getters, None if there is none.
+        """
+        return self._frame_pool;
+
+    def setLazyImages(self, enable):
+        """
+        | Enable or disable lazy images (disabled by default).
+        | When enabled, image getters called without 'out' (and getFrame, renderFrames) return LazyImage objects
+        | (see surrender.lazy_image) keeping the payload as received: it is only decompressed and decoded when
+        | the array is accessed, LazyImage.save writes it to storage without decompressing it.
+        | The FramePool is not used for lazy images.
+        """
+        self._lazy_images = bool(enable);
+
+    def getLazyImages(self):
+        """
+        Return True if image getters return LazyImage objects (see setLazyImages).
+        """
+        return self._lazy_images;
+
+    def setNumpyDecoding(self, enable):
+        """
+        | Enable (true) or disable (false) decoding of lists of numbers as numpy arrays in server replies.
+        | Lists of numbers of the same type are returned as 1D arrays, lists of such lists with the same size as 2D arrays
+        | (for instance generateMicroTasks returns a (N, 9) float64 array). Other lists are still returned as lists.
+        | Default: disabled
+        """
+        self._decoder.numpy_lists = bool(enable);
+
+    def setAsync(self, enable):
+        """
+        | Enable (true) or disable (false) asynchronous mode.
+        | In asynchronous mode commands which don't return anything don't wait for the server: they return a CommandFuture
+        | (see surrender.command_future) and their acknowledgement is read later. Use sync() to wait for all of them.
+        | Their errors are raised by the next command waiting for its reply (a getter for instance) or by sync(),
+        | unless they have been retrieved from their CommandFuture.
+        | In synchronous mode these commands wait for the server and raise server errors immediately.
+        | Default: enabled
+        """
+        if not enable:
+            self.sync();
+        self._async = bool(enable);
+
+    def setMaxPendingCommands(self, n):
+        """
+        | Set the maximum number of commands sent in asynchronous mode which can wait for their acknowledgement.
+        | Once it is reached, a new command first reads the oldest acknowledgements.
+        | Default: 256
+        """
+        if n < 1:
+            raise ValueError("at least one pending command is required");
+        self._max_pending = int(n);
+
+    def getPendingCommandCount(self):
+        """
+        Return the number of commands sent in asynchronous mode still waiting for their acknowledgement.
+        """
+        return len(self._pending);
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        | Context manager gathering the commands issued inside the block, to send them all at once:
+        |     with client.batch():
+        |         client.setObjectPosition("earth", pos_earth)
+        |         client.setObjectPosition("moon", pos_moon)
+        |         client.setSunPower(sun_power)
+        | On exit the commands are serialized into a single buffer and sent with one write. Redundant state updates
+        | are collapsed (see surrender.command_batch). Commands return a CommandFuture even in synchronous mode,
+        | in synchronous mode the exit waits for all the acknowledgements (raising server errors, see sync()).
+        | A command returning a result (getImage, ...), sync() or waiting for a future inside the block sends the
+        | commands recorded so far. If the block raises an exception the commands not sent yet are discarded.
+        | Nested batches are merged with the outer one.
+        """
+        if self._batch is not None:
+            yield self;
+            return;
+        self._check_connection();
+        self._batch = CommandBatch();
+        self._stream = self._batch;
+        try:
+            yield self;
+        except BaseException:
+            self._end_batch(RuntimeError("batch aborted"));
+            raise;
+        self._end_batch();
+        if not self._async:
+            self.sync();
+
+    def sync(self):
+        """
+        | Wait for the acknowledgement of all the commands sent in asynchronous mode.
+        | Raises a RuntimeError if one of them failed and its error was not retrieved from its CommandFuture.
+        """
+        if self._batch is not None:
+            self._send_batch();
+        if self.isConnected():
+            self._flush(True);
+        while self._pending:
+            self._read_ack();
+        self.checkErrors();
+
+    def checkErrors(self):
+        """
+        | Raise a RuntimeError if a command acknowledged so far failed and its error was not retrieved from its CommandFuture.
+        | Unlike sync() this doesn't wait for the pending commands.
+        """
+        failed = [f for f in self._failed if not f._observed];
+        self._failed = [];
+        if failed:
+            for f in failed:
+                f._observed = True;
+            msg = str(failed[0]._error);
+            if len(failed) > 1:
+                msg += "({} more commands failed)\n".format(len(failed) - 1);
+            raise RuntimeError("{}: {}".format(failed[0].command_id, msg));
+
+    def renderFrames(self, schedule, setup, outputs = ("getImage",), depth = 2):
+        """
+        | Render a sequence of frames through a pipeline: the scene update, rendering and readback requests of the next
+        | frames are sent before the outputs of the current frame are read, so the server renders frame N+1 while
+        | the client receives and decodes frame N.
+        | schedule is an iterable of frame descriptions (poses, dates, ...) and setup(client, item) issues the commands
+        | setting the scene state of a frame (setObjectPosition, setSunPowerAtDistance, ...). They are sent as a batch.
+        | outputs are the image getters called for each frame ("getImage", "getDepthMap", "getLOSMap", ...) and "getMetadata".
+        | depth is the number of frames in flight, 2 means double buffering.
+        | This is a generator yielding (item, images) in the order of the schedule, images is a Frame (see surrender.frame) mapping the outputs to their arrays.
+        | Server errors are raised when the frame they belong to is yielded.
+        """
+        if depth < 1:
+            raise ValueError("renderFrames needs at least one frame in flight");
+        self._check_outputs(outputs);
+        self._check_connection();
+
+        frames = collections.deque();
+        for item in schedule:
+            frames.append(self._send_frame(item, setup, outputs));
+            if len(frames) >= depth:
+                yield self._frame_result(frames.popleft(), outputs);
+        while frames:
+            yield self._frame_result(frames.popleft(), outputs);
 
-        return np.flipud(img);
+    def getFrame(self, outputs = ("getImage", "getDepthMap", "getNormalMap", "getLOSMap", "getTimeMap")):
+        """
+        | Return several outputs of the last rendered image as a Frame (see surrender.frame), a dict mapping
+        | the getters in 'outputs' to their results (see renderFrames for the supported outputs).
+        | All the requests are sent at once and the replies are read back to back: this costs one round trip
+        | instead of one per getter. Each output is decoded by a thread while the next ones are received.
+        """
+        self._check_outputs(outputs);
+        self._check_connection();
+        was_async = self._async;
+        self._async = True;
+        try:
+            with self.batch():
+                futures = [self._post_output(name) for name in outputs];
+        finally:
+            self._async = was_async;
+        # Outputs are decoded by the threads decompressing the payloads. A payload has been fully received, and all its
+        # decompression work queued, before its decoding is queued: a decoding task never waits for a task queued after it
+        executor = _shared_executor();
+        decoded = [];
+        for f in futures:
+            f.wait();
+            decoded.append(executor.submit(f.result));
+        images = [d.result() for d in decoded];
+        # Failures of the commands sent before (render, ...) have been acknowledged before the outputs
+        self.checkErrors();
+        return Frame(zip(outputs, images));
+
+    # Check the outputs of getFrame and renderFrames
+    def _check_outputs(self, outputs):
+        for name in outputs:
+            if name != "getMetadata" and (name not in self._IMAGE_REPLIES or name == "getImageSpectrumProjection"):
+                raise ValueError("unsupported output: {}".format(name));
+
+    # Send the scene update, rendering and output requests of a frame of renderFrames as one batch
+    def _send_frame(self, item, setup, outputs):
+        was_async = self._async;
+        self._async = True;
+        try:
+            with self.batch():
+                if setup is not None:
+                    setup(self, item);
+                render = self.render();
+                images = [self._post_output(name) for name in outputs];
+        finally:
+            self._async = was_async;
+        return (item, render, images);
+
+    # Wait for a frame sent by _send_frame
+    def _frame_result(self, frame, outputs):
+        item, render, images = frame;
+        render.result();
+        # The scene update of the frame has been acknowledged before its rendering
+        self.checkErrors();
+        return item, Frame(zip(outputs, [f.result() for f in images]));
+
+    def renderROI(self, roi, output = "getImage"):
+        """
+        | Render only a region of interest of the image and return it cropped.
+        | roi is either a rectangle (x, y, width, height) in pixels or a (height, width) boolean mask of the image,
+        | in which case the bounding box of the mask is returned and the pixels outside the mask are 0.
+        | The rectangle is clipped to the image, the mask must have the size of the image.
+        | Only the µtasks of the pixels of the region are rendered (see generateMicroTasks and renderMicroTasks).
+        | The µtasks of the full image are generated once and cached until the camera model, the image size
+        | or the pixel sampling change, or Lua code is run.
+        | output is the image getter reading the region ("getImage", "getImageGray32F", "getDepthMap", ...).
+        | NB: works in raytracing only
+        """
+        if output not in self._IMAGE_REPLIES or output == "getImageSpectrumProjection":
+            raise ValueError("unsupported output: {}".format(output));
+        key, dtype, channels, empty_is_none, byte_planes = self._IMAGE_REPLIES[output];
+        utasks, rows, (image_width, image_height) = self._roi_micro_tasks();
+
+        if isinstance(roi, np.ndarray) and roi.dtype == bool:
+            if roi.shape != (image_height, image_width):
+                raise ValueError("mask of shape {}, expected {}".format(roi.shape, (image_height, image_width)));
+            ys, xs = np.nonzero(roi);
+            if len(ys) == 0:
+                x, y, width, height = 0, 0, 0, 0;
+            else:
+                x, y = int(xs.min()), int(ys.min());
+                width, height = int(xs.max()) + 1 - x, int(ys.max()) + 1 - y;
+        else:
+            x, y, width, height = (int(v) for v in roi);
+            if width < 0 or height < 0:
+                raise ValueError("invalid region size {}x{}".format(width, height));
+            x1, y1 = min(x + width, image_width), min(y + height, image_height);
+            x, y = min(max(x, 0), image_width), min(max(y, 0), image_height);
+            width, height = max(x1 - x, 0), max(y1 - y, 0);
+        crop = (slice(y, y + height), slice(x, x + width));
+
+        # µtasks are sorted by row: the rows of the region are found by bisection
+        selected = utasks[np.searchsorted(rows, y):np.searchsorted(rows, y + height)];
+        tx = selected[:, micro_tasks.X].astype(np.int64);
+        inside = (tx >= x) & (tx < x + width);
+        if isinstance(roi, np.ndarray) and roi.dtype == bool:
+            inside[inside] = roi[selected[inside, micro_tasks.Y].astype(np.int64), tx[inside]];
+        selected = selected[inside];
+
+        if len(selected) == 0:
+            shape = (height, width) if channels == 1 else (height, width, channels);
+            return np.zeros(shape, dtype=dtype);
+        self.renderMicroTasks(selected);
+        image = getattr(self, output)();
+        if image is None:
+            return None;
+        return np.array(image[crop]);
+
+    # generateMicroTasks with the µtasks decoded as a (N, 9) array whatever the numpy decoding mode (see setNumpyDecoding)
+    def _generate_micro_tasks(self):
+        self._check_connection();
+        self._stream.writeQVariantHash({ "" : "generateMicroTasks" });
+        self._flush(True);
+        ret = self._read_return("generateMicroTasks", numpy_lists = True);
+        return ret["utasks"];
+
+    # µtasks of the full image sorted by row (stable), their rows and the image size, generated if not cached
+    def _roi_micro_tasks(self):
+        if self._micro_tasks is None:
+            utasks = micro_tasks.generateMicroTasks(self);
+            rows = utasks[:, micro_tasks.Y].astype(np.int64);
+            order = np.argsort(rows, kind='stable');
+            width, height = self.getImageSize();
+            self._micro_tasks = (utasks[order], rows[order], (int(width), int(height)));
+        return self._micro_tasks;
 
     def setVerbosityLevel(self, verbosity_level):
         """
@@ -473,17 +687,7 @@ class surrender_client_base:
         | append enables keeping file content, otherwise file content is discarded before writing.
         """
         self._check_connection();
-        params = {
-            "filename" : str(filename),
-            "compressed" : bool(compressionLevel > 0),
-            "offset" : int(offset),
-            "append" : bool(append),
-            "" : "sendFile"
-            };
-        if (compressionLevel <= 0):
-            params["data"] = data;
-        else:
-            params["data"] = self._compress(data, compressionLevel);
+        params = self._send_file_params(filename, data, compressionLevel, offset, append);
         self._stream.writeQVariantHash(params);
         self._flush(True);
         self._read_return("sendFile");
@@ -496,7 +700,145 @@ class surrender_client_base:
         | compressionLevel level of zlib compression ranging from 0 (no compression) to 9 (maximum compression).
         """
         self._check_connection();
+        params = self._sync_dir_params(dirname, compressionLevel);
+        self._stream.writeQVariantHash(params);
+        self._flush(True);
+
+        self._read_return("syncDir");
+
+    def syncFile(self, fname, server_fname = None, compressionLevel = -1):
+        """
+        | Synchronize a server file with a local file.
+        | This function first sends check sums to send data only when needed.
+        | fname is the name of the client file to be synchronized on the server.
+        | server_fname is the name of the file on the server. If None it is assumed to be the same as fname.
+        | compressionLevel level of zlib compression ranging from 0 (no compression) to 9 (maximum compression).
+        """
+        self._check_connection();
+        params = self._sync_file_params(fname, server_fname, compressionLevel);
+        self._stream.writeQVariantHash(params);
+        self._flush(True);
+
+        self._read_return("syncDir");
+
+    def sendImageTo(self,
+                    target,  # IP / Hostname
+                    port,
+                    format,  # raw, lz4, zlib
+                    depth,   # 8, 16, 32
+                    channels,# 1, 2, 3, 4
+                    texture_name = ""):   # texture name or empty for frame _buffer
+        """
+        | Send an image over another TCP/IP link.
+        | target is the hostname/IP of the destination.
+        | port is the port over which to connect.
+        | format is either \"raw\", \"lz4\" or \"zlib\", a \"_bs\" suffix can be used to swap bytes in order to match a different endianness (\"raw_bs\", \"lz4_bs\" or \"zlib_bs\").
+        | depth is the number of bits per plane (8, 10, 12, 14, 16 or 32). 10, 12, 14 and 16 bits are stored as 16bits elements
+        | channels is the number of planes (1, 2, 3 or 4).
+        | texture_name is the name of the source texture to send. Empty string means the last rendered image.
+        """
+        self._check_connection();
+        params = {
+            "target_name" : str(target),
+            "format" : str(format),
+            "port" : int(port),
+            "depth" : int(depth),
+            "channels" : int(channels),
+            "texture_name" : str(texture_name),
+            "" : "sendImageTo"
+            };
+        self._stream.writeQVariantHash(params);
+        self._flush(True);
+
+    # Message of updateUserDataTexture
+    def _user_data_texture_params(self, name, data, compressionLevel):
+        params = {
+            "name" : str(name),
+            "" : "updateUserDataTexture"
+            };
+        if compressionLevel != -2:  # Zlib compression (deflate)
+            params["data"] = self._compress(data, compressionLevel);
+        else:                       # LZ4 compression
+##ifdef LZ4_FOUND
+#            params["size"] = uint32_t(data.size() * sizeof(data.front()));
+#            params["use_lz4"] = true;
+#            QByteArray qdata = QByteArray::fromRawData((const char*)data.data(), data.size() * sizeof(data.front()));
+#            const int worst_size = LZ4_compressBound(qdata.size());
+#            QByteArray lz4_data(worst_size, Qt::Uninitialized);
+#            const int lz4_size = LZ4_compress(qdata.data(), lz4_data.data(), qdata.size());
+#            lz4_data.resize(lz4_size);
+#            params["data"] = lz4_data;
+##else
+            self._printError("LZ4 support not implemented, falling back to zlib compression level 1");
+            params["data"] = self._compress(data, 1);
+        return params;
+
+    # Message of setPSF
+    def _psf_params(self, psf_image, support_w = -1, support_h = -1, blooming_threshold_distance = 0):
+        w = psf_image.shape[1];
+        h = psf_image.shape[0];
+        
+        psf = np.array(psf_image, dtype=np.float32).tobytes();
+
+        params = {
+            "w" : int(w),
+            "h" : int(h),
+            "psf" : psf,
+            "support_w" : float(support_w),
+            "support_h" : float(support_h),
+            "blooming_threshold_distance" : int(blooming_threshold_distance),
+            "" : "setPSF"
+            };
+        return params;
+
+    # Message of setPSFWithTail
+    def _psf_with_tail_params(self, psf_image, psf_tail_image, PSF_tail_coef, support_w = -1, support_h = -1, support_w_tail = -1, support_h_tail = -1):
+        w = psf_image.shape[1];
+        h = psf_image.shape[0];
+        w_tail = psf_tail_image.shape[1];
+        h_tail = psf_tail_image.shape[0];
         
+        psf = np.array(psf_image, dtype=np.float32).tobytes();
+
+        psf_tail = np.array(psf_tail_image, dtype=np.float32).tobytes();
+
+        params = {
+            "w" : int(w),
+            "h" : int(h),
+            "psf" : psf,
+            "support_w" : float(support_w),
+            "support_h" : float(support_h),
+
+            "w_tail" : int(w_tail),
+            "h_tail" : int(h_tail),
+            "psf_tail" : psf_tail,
+            "support_w_tail" : float(support_w_tail),
+            "support_h_tail" : float(support_h_tail),
+
+            "blooming_threshold_distance" : int(0),
+            "PSF_tail_coef" : float(PSF_tail_coef),
+
+            "" : "setPSFWithTail"
+            };
+        return params;
+
+    # Message of sendFile
+    def _send_file_params(self, filename, data, compressionLevel = -1, offset = 0, append = False):
+        params = {
+            "filename" : str(filename),
+            "compressed" : bool(compressionLevel > 0),
+            "offset" : int(offset),
+            "append" : bool(append),
+            "" : "sendFile"
+            };
+        if (compressionLevel <= 0):
+            params["data"] = data;
+        else:
+            params["data"] = self._compress(data, compressionLevel);
+        return params;
+
+    # Message of syncDir
+    def _sync_dir_params(self, dirname, compressionLevel = -1):
         files = []
         for (dirpath, dirnames, filenames) in os.walk(dirname):
             for f in filenames:
@@ -525,21 +867,10 @@ class surrender_client_base:
             "compressionLevel" : int(compressionLevel),
             "" : "syncDir"
             };
-        self._stream.writeQVariantHash(params);
-        self._flush(True);
+        return params;
 
-        self._read_return("syncDir");
-
-    def syncFile(self, fname, server_fname = None, compressionLevel = -1):
-        """
-        | Synchronize a server file with a local file.
-        | This function first sends check sums to send data only when needed.
-        | fname is the name of the client file to be synchronized on the server.
-        | server_fname is the name of the file on the server. If None it is assumed to be the same as fname.
-        | compressionLevel level of zlib compression ranging from 0 (no compression) to 9 (maximum compression).
-        """
-        self._check_connection();
-        
+    # Message of syncFile
+    def _sync_file_params(self, fname, server_fname = None, compressionLevel = -1):
         if type(server_fname) == type(None):
             server_fname = fname;
         
@@ -570,43 +901,21 @@ class surrender_client_base:
             "compressionLevel" : int(compressionLevel),
             "" : "syncDir"
             };
-        self._stream.writeQVariantHash(params);
-        self._flush(True);
-
-        self._read_return("syncDir");
-
-    def sendImageTo(self,
-                    target,  # IP / Hostname
-                    port,
-                    format,  # raw, lz4, zlib
-                    depth,   # 8, 16, 32
-                    channels,# 1, 2, 3, 4
-                    texture_name = ""):   # texture name or empty for frame _buffer
-        """
-        | Send an image over another TCP/IP link.
-        | target is the hostname/IP of the destination.
-        | port is the port over which to connect.
-        | format is either \"raw\", \"lz4\" or \"zlib\", a \"_bs\" suffix can be used to swap bytes in order to match a different endianness (\"raw_bs\", \"lz4_bs\" or \"zlib_bs\").
-        | depth is the number of bits per plane (8, 10, 12, 14, 16 or 32). 10, 12, 14 and 16 bits are stored as 16bits elements
-        | channels is the number of planes (1, 2, 3 or 4).
-        | texture_name is the name of the source texture to send. Empty string means the last rendered image.
-        """
-        self._check_connection();
-        params = {
-            "target_name" : str(target),
-            "format" : str(format),
-            "port" : int(port),
-            "depth" : int(depth),
-            "channels" : int(channels),
-            "texture_name" : str(texture_name),
-            "" : "sendImageTo"
-            };
-        self._stream.writeQVariantHash(params);
-        self._flush(True);
+        return params;
 
+    # Send the serialized messages waiting in the write buffer.
+    # Without b_force data is only sent once the buffer grows above _write_buffer_size.
     def _flush(self, b_force = False):
-        if (self._sock and b_force):
-            self._sock.sendall(b'');
+        buf = self._encoder.buffer;
+        if not buf:
+            return;
+        if not b_force and len(buf) < self._write_buffer_size:
+            return;
+        try:
+            if self._sock:
+                self._sock.sendall(buf);
+        finally:
+            self._encoder.reset();
 
     def _printError(self, s):
         print(s, end='');
@@ -618,34 +927,179 @@ class surrender_client_base:
             self._printError("error: you must connect to a server before sending commands.\n");
             raise RuntimeError("error: you must connect to a server before sending commands.\n");
 
-    def _read_return(self, COMMAND_ID):
+    # Return value of the commands without a result: a CommandFuture in asynchronous mode,
+    # in synchronous mode the reply is read immediately.
+    def _post(self, COMMAND_ID):
+        if COMMAND_ID in self._MICRO_TASKS_INVALIDATORS:
+            self._micro_tasks = None;
+        if self._batch is None and not self._async:
+            self._read_return(COMMAND_ID);
+            return None;
+        return self._queue(CommandFuture(self, COMMAND_ID));
+
+    # Send a request without reading its reply: return a CommandFuture whose result is decode(reply)
+    def _post_request(self, params, decode):
+        self._check_connection();
+        self._stream.writeQVariantHash(params);
+        self._flush(True);
+        return self._queue(CommandFuture(self, params[""], decode));
+
+    # Request of an image getter, the result of the future is the image
+    def _post_image(self, COMMAND_ID, params = None):
+        if params is None:
+            params = { "" : COMMAND_ID };
+        return self._post_request(params, lambda ret: self._image_from_return(ret, COMMAND_ID));
+
+    # Request of an output of renderFrames
+    def _post_output(self, name):
+        if name == "getMetadata":
+            return self._post_request({ "" : "getMetadata" }, lambda ret: ret["metadata"]);
+        return self._post_image(name);
+
+    # Track the acknowledgement of the command just written
+    def _queue(self, future):
+        if self._batch is not None:
+            self._batch.attach(future);
+            return future;
+        while len(self._pending) >= self._max_pending:
+            self._read_ack();
+        self._pending.append(future);
+        return future;
+
+    # Read the next message addressed to the oldest pending command
+    def _read_ack(self):
+        if self._batch is not None:
+            self._send_batch();
+        if not self.isConnected():
+            self._fail_pending(RuntimeError("Connection closed"));
+            return;
+        self._flush(True);
+        if not self._pending:
+            return;
+        future = self._pending[0];
+        reply = self._IMAGE_REPLIES.get(future.command_id) if future._decode is not None else None;
+        if reply is not None:
+            self._set_payload_buffer(reply[0]);
+        try:
+            ret = self.readQVariantHash();
+        except Exception as e:
+            self._fail_pending(e);
+            raise;
+        command_id = ret.get("");
+        if command_id == None or command_id == "":
+            try:
+                self._log_message(ret);
+            except RuntimeError as e:
+                if future._error is None:
+                    future._error = e;
+            return;
+        if command_id != future.command_id:
+            return;
+        self._pending.popleft();
+        if reply is not None:
+            self._decoder.payload_buffers.pop(reply[0], None);
+        future._done = True;
+        if future._decode is not None:
+            future._reply = ret;
+        for f in future._merged:
+            f._error = future._error;
+            f._done = True;
+        if future._error is not None:
+            self._failed.append(future);
+
+    # The connection is lost: pending commands fail with 'error'
+    def _fail_pending(self, error):
+        while self._pending:
+            future = self._pending.popleft();
+            for f in [future] + future._merged:
+                f._error = error;
+                f._done = True;
+            self._failed.append(future);
+
+    # Send the commands recorded by the current batch (which stays open)
+    def _send_batch(self):
+        for params, futures in self._batch.take():
+            if futures:
+                while len(self._pending) >= self._max_pending:
+                    self._read_ack();
+                future = futures[-1];
+                future._merged = futures[:-1];
+                self._pending.append(future);
+            self.writeQVariantHash(params);
+        self._flush(True);
+
+    # Close the current batch: send its commands, or discard them if 'error' is given (their futures fail with it)
+    def _end_batch(self, error = None):
+        try:
+            if error is None:
+                self._send_batch();
+            else:
+                for params, futures in self._batch.take():
+                    for f in futures:
+                        f._error = error;
+                        f._done = True;
+                        f._observed = True;
+        finally:
+            self._batch = None;
+            self._stream = self;
+
+    def _read_return(self, COMMAND_ID, numpy_lists = None):
+        if self._batch is not None:
+            self._send_batch();
+        # Acknowledgements of the commands sent before come first
+        while self._pending:
+            self._read_ack();
         ret = {};
         file_reqs = []
+        error = None;
         while (self._sock != None and (ret.get("") == None or ret.get("") != COMMAND_ID)):
             self._check_connection();
-            ret = self.readQVariantHash();
+            ret = self.readQVariantHash(numpy_lists);
             # Check if file resend requests are pending
             if ret.get("files2update") != None:
                 file_reqs = ret.get("files2update")
                 
-            if (ret.get("") == None or ret.get("") == "") and self._verbosity_level > 0 and ret.get("data") != None:
-                    msg = ret["data"].decode('utf-8');
-                    error_level = 3;
-                    if msg.find("[error]") != -1:
-                        error_level = 1;
-                    elif msg.find("[warning]") != -1:
-                        error_level = 2;
-                    elif msg.find("[info]") != -1:
-                        error_level = 3;
-                    elif msg.find("[debug]") != -1:
-                        error_level = 4;
-                    if self._verbosity_level >= error_level:
-                        self._printError(msg);
-                    if error_level == 1 and (self._exception_on_error or self._exception_on_warning):
-                        raise RuntimeError(msg);
-                    elif error_level == 2 and self._exception_on_warning:
-                        raise RuntimeError(msg);
+            # Errors are raised once the acknowledgement of the command has been read, otherwise it would be
+            # left in the stream and taken for the acknowledgement of the next command with the same id
+            try:
+                self._log_message(ret);
+            except RuntimeError as e:
+                if error is None:
+                    error = e;
         
+        for args in self._file_chunks(file_reqs):
+            self.sendFile(*args);
+        # Failures of the commands sent before in asynchronous mode are raised by the first command waiting for its reply
+        # (unless their error has been retrieved from their CommandFuture), like they would have been in synchronous mode
+        self.checkErrors();
+        if error is not None:
+            raise error;
+                        
+        return ret;
+
+    # Print the server log message 'ret' (if it is one) according to the verbosity level,
+    # raise a RuntimeError for errors (and warnings if _exception_on_warning is set)
+    def _log_message(self, ret):
+        if (ret.get("") == None or ret.get("") == "") and self._verbosity_level > 0 and ret.get("data") != None:
+            msg = ret["data"].decode('utf-8');
+            error_level = 3;
+            if msg.find("[error]") != -1:
+                error_level = 1;
+            elif msg.find("[warning]") != -1:
+                error_level = 2;
+            elif msg.find("[info]") != -1:
+                error_level = 3;
+            elif msg.find("[debug]") != -1:
+                error_level = 4;
+            if self._verbosity_level >= error_level:
+                self._printError(msg);
+            if error_level == 1 and (self._exception_on_error or self._exception_on_warning):
+                raise RuntimeError(msg);
+            elif error_level == 2 and self._exception_on_warning:
+                raise RuntimeError(msg);
+
+    # Files requested by the server after a syncDir: yields the sendFile arguments of each chunk to send
+    def _file_chunks(self, file_reqs):
         for req in file_reqs:
             if req.get("requested_file") != None and req.get("dirname") != None and req.get("compressionLevel") != None:
                 compressionLevel = req.get("compressionLevel")
@@ -662,7 +1116,7 @@ class surrender_client_base:
                     offset = 0;
                     append = False;
                     for chunk in iter(lambda: f.read(1048576), b""):
-                        self.sendFile(target, chunk, compressionLevel, offset, append);
+                        yield (target, chunk, compressionLevel, offset, append);
                         offset += len(chunk);
                         append = True;
 
@@ -671,229 +1125,148 @@ class surrender_client_base:
                             last_ratio = ratio
                             print('\r{}%    '.format(ratio), end='', flush=True)
                 print('\r    \r', end='', flush=True)
-                        
-        return ret;
+
+    # Read the reply of an image getter and decode its payload as a (h, w, channels) array (see _IMAGE_REPLIES), rows top to bottom.
+    # If an output array is given (or taken from the frame pool), the payload is received directly in its memory when possible.
+    def _read_image_return(self, COMMAND_ID, out = None):
+        key, dtype, channels, empty_is_none, byte_planes = self._IMAGE_REPLIES[COMMAND_ID]
+        dtype = np.dtype(dtype)
+        pool = self._frame_pool if out is None and not self._lazy_images else None
+        # Replies of the commands sent before come first, they must not be received in the buffers of this one
+        while self._pending:
+            self._read_ack()
+        # The slot is claimed before receiving in it, so that clients sharing the pool never receive in the same array
+        slot, target = pool.reserve(COMMAND_ID) if pool is not None else (None, out)
+        into = None
+        if target is not None and target.dtype == dtype and target.flags.c_contiguous and target.flags.writeable:
+            into = memoryview(target).cast('B')
+        # 'out' is only written in place with an image of its shape (see _OutputPayload), otherwise the shape check
+        # of _image_from_return raises before 'out' is touched
+        pixel = (channels,) if channels > 1 else ()
+        if out is not None and (out.ndim != 2 + len(pixel) or out.shape[2:] != pixel):
+            into = None
+        self._set_payload_buffer(key, into, out)
+        try:
+            ret = self._read_return(COMMAND_ID)
+        finally:
+            self._decoder.payload_buffers.clear()
+        return self._image_from_return(ret, COMMAND_ID, out, slot)
+
+    # Decode the reply 'ret' of an image getter (see _read_image_return), in the slot of the frame pool reserved
+    # for it if any (a new one otherwise)
+    def _image_from_return(self, ret, COMMAND_ID, out = None, slot = None):
+        key, dtype, channels, empty_is_none, byte_planes = self._IMAGE_REPLIES[COMMAND_ID]
+        dtype = np.dtype(dtype)
+        pool = self._frame_pool if out is None and not self._lazy_images else None
+        w32 = ret["w"];
+        h32 = ret["h"];
+
+        if empty_is_none and w32 * h32 == 0:
+            return None
+
+        shape = (h32, w32) if channels == 1 else (h32, w32, channels)
+        if self._lazy_images and out is None:
+            return LazyImage(ret[key], ret["compressed"], shape, dtype, byte_planes)
+        if pool is not None:
+            out = pool.acquire(COMMAND_ID, shape, dtype) if slot is None else pool.fit(COMMAND_ID, slot, shape, dtype)
+        elif out is not None and out.shape != shape:
+            raise ValueError("{}: 'out' has shape {}, expected {}".format(COMMAND_ID, out.shape, shape))
+
+        _buf = ret[key]
+        if isinstance(_buf, PayloadInflater):
+            # Decompressed while it was received (see _set_payload_buffer)
+            _buf = _buf.result(h32 * w32 * channels * dtype.itemsize) if ret["compressed"] else _buf.raw()
+        elif ret["compressed"]:
+            _buf = self._uncompress(_buf)
+        if ret["compressed"]:
+            if byte_planes:
+                # Reorder bytes (splitting the 4 bytes of each float into 4 planes helps compressing data)
+                _buf = np.frombuffer(_buf, dtype=np.uint8).reshape(dtype.itemsize, h32, w32).transpose(1,2,0).tobytes()
+        elif out is not None and isinstance(_buf, memoryview) and _buf.obj is out:
+            # Received in place, only the row order has to be fixed
+            self._flip_rows(out)
+            return out
+
+        img = np.flipud(np.frombuffer(_buf, dtype=dtype).reshape(shape))
+        if out is None:
+            return img
+        np.copyto(out, img)
+        return out
+
+    # Set where the payload 'key' of the next reply is received: in 'into' (a memoryview) when possible and, if compression
+    # has been enabled with setCompressionLevel, through a PayloadInflater decompressing it while it arrives
+    # (unless the payload is kept for a LazyImage). Payloads are not decompressed speculatively when the level is unknown.
+    # The array 'out' given by the caller of a getter is only written with an image of its shape (see _OutputPayload):
+    # it doesn't hold compressed payloads, which are decompressed apart and copied into it once their shape has been checked.
+    def _set_payload_buffer(self, key, into = None, out = None):
+        if self._compression_level is not None and self._compression_level > 0 and not (self._lazy_images and into is None):
+            into = PayloadInflater(None if out is not None else into);
+        elif into is not None and out is not None:
+            into = _OutputPayload(out);
+        if into is not None:
+            self._decoder.payload_buffers[key] = into;
+
+    # Reverse the order of the rows of an array in place, swapping blocks of rows through a small temporary buffer
+    def _flip_rows(self, a):
+        h = a.shape[0]
+        if h < 2 or a.size == 0:
+            return
+        k = max(1, min(h // 2, (1 << 20) // a[0].nbytes))
+        tmp = np.empty((k,) + a.shape[1:], dtype=a.dtype)
+        i = 0
+        while i < h // 2:
+            n = min(k, h // 2 - i)
+            top = a[i:i + n]
+            bottom = a[h - i - n:h - i]
+            tmp[:n] = top
+            top[...] = bottom[::-1]
+            bottom[...] = tmp[:n][::-1]
+            i += n
 
     # This will fail if object is not iterable which is desired behavior
     def _vec(self, v):
-        return np.array(v, dtype=np.float64).tolist()
+        return np.array(v, dtype=np.float64)
 
     # This will fail if object is not a 4x4 numpy array
     def _mat44(self, v):
-        return [ [ float(v[j,i]) for i in range(4) ] for j in range(4)]
-
-    # Write support functions    
-    def _write_int8(self, v):
-        self._sock.send(struct.pack('>b', int(v)))
-    def _write_uint8(self, v):
-        self._sock.send(struct.pack('>B', int(v)))
-    def _write_int16(self, v):
-        self._sock.send(struct.pack('>h', int(v)))
-    def _write_uint16(self, v):
-        self._sock.send(struct.pack('>H', int(v)))
-    def _write_int32(self, v):
-        self._sock.send(struct.pack('>i', int(v)))
-    def _write_uint32(self, v):
-        self._sock.send(struct.pack('>I', int(v)))
-    def _write_int64(self, v):
-        self._sock.send(struct.pack('>q', int(v)))
-    def _write_uint64(self, v):
-        self._sock.send(struct.pack('>Q', int(v)))
-    def _write_float32(self, v):
-        self._sock.send(struct.pack(">f", float(v)))
-    def _write_float64(self, v):
-        self._sock.send(struct.pack(">d", float(v)))
-
-    def _write_string(self, v):
-        v = str(v)
-        if v == '':
-            self._write_uint32(0xFFFFFFFF)
-            return
-        data = v.encode('utf-16be')
-        self._write_uint32(len(data))
-        self._sock.send(data)
-
-    def _write_map(self, table):
-        self._write_uint32(len(table))
-        for k in table:
-            v = table[k]
-            self._write_string(k)
-            self._write(v)
-
-    def _write_list(self, table):
-        self._write_uint32(len(table))
-        for k in table:
-            self._write(k)
-
-    def _write_bytearray(self, buffer):
-        if len(buffer) == 0:
-            self._write_uint32(0xFFFFFFFF)
-            return
-        self._write_uint32(len(buffer))
-        self._sock.send(buffer)
-        
-    def _write(self, v):
-        T = type(v)
-        if T == np.float16 or\
-            T == np.float32 or\
-            T == np.float64 or\
-            T == np.float or\
-            T == float:
-            self._write_uint32(self._DT_Double)
-            self._write_uint8(0)
-            self._write_float64(v)
-        elif T == bool:
-            self._write_uint32(self._DT_Bool)
-            self._write_uint8(0)
-            self._write_uint8(v)
-        elif T == np.int8 or\
-            T == np.int16 or\
-            T == np.int32 or\
-            T == np.int64 or\
-            T == np.int or\
-            T == np.uint8 or\
-            T == np.uint16 or\
-            T == np.uint32 or\
-            T == np.uint64 or\
-            T == np.uint or\
-            T == int:
-            if v >= -2147483648 and v <= 2147483647:
-                self._write_uint32(self._DT_Int)
-                self._write_uint8(0)
-                self._write_int32(v)
-            elif v >= 0 and v <= 4294967295:
-                self._write_uint32(self._DT_UInt)
-                self._write_uint8(0)
-                self._write_uint32(v)
-            else:
-                self._write_uint32(self._DT_ULongLong)
-                self._write_uint8(0)
-                self._write_uint64(v)
-        elif T == str:
-            self._write_uint32(self._DT_String)
-            self._write_uint8(0)
-            self._write_string(v)
-        elif T == dict:
-            self._write_uint32(self._DT_Hash)
-            self._write_uint8(0)
-            self._write_map(v)
-        elif T == list or T == tuple or T == np.ndarray:    # Interpret tuples and numpy arrays as lists
-            self._write_uint32(self._DT_List)
-            self._write_uint8(0)
-            self._write_list(v)
-        elif T == bytes:
-            self._write_uint32(self._DT_ByteArray)
-            self._write_uint8(0)
-            self._write_bytearray(v)
-        else:
-            self._write_uint32(self._DT_Invalid)
-            self._write_uint8(0)
+        m = np.asarray(v, dtype=np.float64)[0:4, 0:4]
+        if m.shape != (4, 4):
+            raise ValueError("a 4x4 matrix is required, got shape {}".format(np.shape(v)))
+        return m
 
     # Serializes a dictionnary (which maps string to values) as a QHash<QString, QVariant>
+    # The message is appended to the write buffer, call _flush(True) to send it.
     def writeQVariantHash(self, table):
-        self._write_uint32(len(table))
-        for k in table:
-            v = table[k]
-            self._write_string(k)
-            self._write(v)
+        self._encoder.writeQVariantHash(table)
+        self._flush()
         return
 
-    # Read support functions
-    def _recv(self, l):
-        ret = self._sock.recv(l)
-        if ret == b'' or ret == None:
-            return b''
-        while len(ret) < l:
-            buf = self._sock.recv(l - len(ret))
-            if buf == b'' or ret == None:
-                self._sock = None
-                raise RuntimeError('Socket error')
-            ret = ret + buf
-        return ret;
-        
-    def _read_uint8(self):
-        return struct.unpack('B', self._recv(1))[0];
-    def _read_int8(self):
-        return struct.unpack('b', self._recv(1))[0];
-    def _read_uint16(self):
-        return struct.unpack('>H', self._recv(2))[0];
-    def _read_int16(self):
-        return struct.unpack('>h', self._recv(2))[0];
-    def _read_uint32(self):
-        return struct.unpack('>I', self._recv(4))[0];
-    def _read_int32(self):
-        return struct.unpack('>i', self._recv(4))[0];
-    def _read_uint64(self):
-        return struct.unpack('>Q', self._recv(8))[0];
-    def _read_int64(self):
-        return struct.unpack('>q', self._recv(8))[0];
-    def _read_float32(self):
-        return struct.unpack('>f', self._recv(4))[0];
-    def _read_float64(self):
-        return struct.unpack('>d', self._recv(8))[0];
-
-    def _read_string(self):
-        l = self._read_uint32();
-        if l == 0xFFFFFFFF:
-            return '';
-        return self._recv(l).decode('utf-16be');
-        
-    def _read_map(self):
-        nb_elts = self._read_uint32()
-        table = {}
-        for i in range(nb_elts):
-            k = self._read_string()
-            table[k] = self._read()
-        return table
-
-    def _read_list(self):
-        nb_elts = self._read_uint32()
-        table = []
-        for i in range(nb_elts):
-            table.append(self._read())
-        return table
-        
-    def _read_bytearray(self):
-        l = self._read_uint32()
-        if l == 0 or l == 0xFFFFFFFF:
-            return b''
-        return self._recv(l)
-        
-    def _read(self):
-        T = self._read_uint32()
-        self._read_uint8()
-        if T == self._DT_Double:
-            return self._read_float64()
-        elif T == self._DT_Bool:
-            return self._read_uint8() != 0
-        elif T == self._DT_Int:
-            return self._read_int32()
-        elif T == self._DT_UInt:
-            return self._read_uint32()
-        elif T == self._DT_ULongLong:
-            return self._read_uint64()
-        elif T == self._DT_String:
-            return self._read_string()
-        elif T == self._DT_Hash or T == self._DT_Map:
-            return self._read_map()
-        elif T == self._DT_List:
-            return self._read_list()
-        elif T == self._DT_ByteArray:
-            return self._read_bytearray()
-        elif T == self._DT_Invalid:
-            return None
-        else:
-            raise RuntimeError('Unsupported type: {}'.format(T))
-            
     # Deserializes a dictionnary (which maps string to values) from a QHash<QString, QVariant>
-    def readQVariantHash(self):
-        return self._read_map()
-    
+    # numpy_lists overrides the list decoding mode set with setNumpyDecoding for this message
+    def readQVariantHash(self, numpy_lists = None):
+        return self._decoder.readQVariantHash(numpy_lists)
+
+    # Transport used by the decoder
+    def _sock_recv(self, l):
+        buf = self._sock.recv(l) if self._sock else b''
+        if buf == b'' or buf == None:
+            self._sock = None
+            raise RuntimeError('Socket error')
+        return buf
+
+    def _sock_recv_into(self, view):
+        l = self._sock.recv_into(view) if self._sock else 0
+        if l == 0:
+            self._sock = None
+            raise RuntimeError('Socket error')
+        return l
+
     # Compression support functions
     def _compress(self, buffer, level):
         buf = zlib.compress(buffer, level)
         return struct.pack('>I', int(len(buf))) + buf
     
     def _uncompress(self, buffer):
-        size = struct.unpack('>I', buffer[0:4])[0]
-        return zlib.decompress(buffer[4:], bufsize = size)
+        size = struct.unpack_from('>I', buffer, 0)[0]
+        with memoryview(buffer) as view:
+            return zlib.decompress(view[4:], bufsize = size)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+
+import numpy as np
+
+
+class Trajectory:
+    """
+    | Time-indexed scene states rendered as a stream of frames by a surrender_client:
+    |     traj = Trajectory(times)
+    |     traj.setObjectPositions("camera", camera_positions)     # (N, 3) array
+    |     traj.setObjectAttitudes("camera", camera_attitudes)     # (N, 4) array
+    |     traj.setObjectPositions("sun", sun_positions)
+    |     traj.setSunPowerAtDistance(sun_power, sun_distances)
+    |     traj.setIntegrationTimes(1e-3)
+    |     for i, frame in traj.render(client, outputs = ("getImage", "getDepthMap", "getMetadata")):
+    |         process(traj.times[i], frame["getImage"], frame["getDepthMap"], frame["getMetadata"])
+    | Frames are rendered with surrender_client.renderFrames: the commands of a frame are sent as one batch and the
+    | next frame is rendered by the server while the current one is received. A parameter is only sent again when its
+    | value changes from one frame to the next.
+    | Per frame values can be given as a single value used for all the frames.
+    """
+    def __init__(self, times):
+        self.times = np.asarray(times, dtype=np.float64).reshape(-1)
+        self._positions = {}
+        self._attitudes = {}
+        self._sun_power = None
+        self._integration_times = None
+
+    def __len__(self):
+        return len(self.times)
+
+    def setObjectPositions(self, object_name, positions):
+        """
+        | Set the positions of object 'object_name' ('camera' for the camera) as a (N, 3) array.
+        """
+        self._positions[str(object_name)] = self._per_frame(positions, (3,))
+
+    def setObjectAttitudes(self, object_name, attitudes):
+        """
+        | Set the attitudes (quaternions) of object 'object_name' ('camera' for the camera) as a (N, 4) array.
+        """
+        self._attitudes[str(object_name)] = self._per_frame(attitudes, (4,))
+
+    def setSunPowerAtDistance(self, sun_color, distance):
+        """
+        | Set the power received from the Sun for each wave length ((N, nb_wavelengths) array) at the given distances ((N,) array).
+        | See surrender_client.setSunPowerAtDistance.
+        """
+        sun_color = np.asarray(sun_color, dtype=np.float64)
+        self._sun_power = (self._per_frame(sun_color, sun_color.shape[-1:]), self._per_frame(distance, ()))
+
+    def setIntegrationTimes(self, integration_time):
+        """
+        | Set the integration times in seconds as a (N,) array.
+        """
+        self._integration_times = self._per_frame(integration_time, ())
+
+    def render(self, client, outputs = ("getImage",), depth = 2, frames = None):
+        """
+        | Render the trajectory with 'client', this is a generator yielding (i, frame) for each frame index i
+        | (all the frames or the indices in 'frames'), frame maps the names of the outputs to their values.
+        | outputs and depth are the same as in surrender_client.renderFrames.
+        | 'client' can also be a ClientPool (see surrender.client_pool) to spread the frames over several servers.
+        """
+        indices = range(len(self)) if frames is None else frames
+        return client.renderFrames(indices, self._frame_setup(), outputs, depth)
+
+    # Per frame values of shape 'shape' as a (N,) + shape array
+    def _per_frame(self, values, shape):
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape == shape:
+            values = np.broadcast_to(values, (len(self),) + shape)
+        if values.shape != (len(self),) + shape:
+            raise ValueError("expected {} per frame values of shape {}, got an array of shape {}".format(len(self), shape, values.shape))
+        return values
+
+    # Function sending the state of a frame, skipping the values already set on the client by its previous frame
+    def _frame_setup(self):
+        sent_by_client = {}
+
+        def setup(client, i):
+            sent = sent_by_client.setdefault(client, {})
+
+            def changed(key, value):
+                if key in sent and np.array_equal(sent[key], value):
+                    return False
+                sent[key] = value
+                return True
+
+            for name, positions in self._positions.items():
+                if changed(("pos", name), positions[i]):
+                    client.setObjectPosition(name, positions[i])
+            for name, attitudes in self._attitudes.items():
+                if changed(("att", name), attitudes[i]):
+                    client.setObjectAttitude(name, attitudes[i])
+            if self._sun_power is not None:
+                sun_color, distance = self._sun_power
+                if changed("sun_power", np.append(sun_color[i], distance[i])):
+                    client.setSunPowerAtDistance(sun_color[i], distance[i])
+            if self._integration_times is not None:
+                if changed("integration_time", self._integration_times[i]):
+                    client.setIntegrationTime(self._integration_times[i])
+
+        return setup
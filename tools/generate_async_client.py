@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# (C) 2019 Airbus copyright all rights reserved
+"""
+Generate surrender/async_surrender_client.py from surrender/surrender_client.py.
+
+Every command of surrender_client becomes a coroutine of async_surrender_client: the sequence writing the
+command and posting it (or reading its reply) is replaced with "await self._call(params)".
+Run it again whenever surrender_client.py is regenerated:
+    python tools/generate_async_client.py            # write surrender/async_surrender_client.py
+    python tools/generate_async_client.py --check    # fail if it is not up to date
+"""
+
+import os
+import re
+import sys
+
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'surrender')
+_SOURCE = os.path.join(_ROOT, 'surrender_client.py')
+_TARGET = os.path.join(_ROOT, 'async_surrender_client.py')
+
+_HEADER = '# (C) 2019 Airbus copyright all rights reserved\n'
+_GENERATED = '# Generated from surrender_client.py by tools/generate_async_client.py, do not edit\n'
+
+# write + flush followed by the handling of the reply in surrender_client
+_SEND = r'self\._stream\.writeQVariantHash\(params\);\n\s+self\._flush\(True\);\n\s+'
+_RULES = [
+    (r'\n    def ', '\n    async def '),
+    (_SEND + r'return self\._post\("\w+"\);', 'await self._call(params);'),
+    (_SEND + r'ret = self\._read_return\("\w+"\);', 'ret = await self._call(params);'),
+    (_SEND + r'self\._read_return\("\w+"\);', 'await self._call(params);'),
+]
+# Calls of the synchronous client that must not be left in the generated code
+_SYNC_CALLS = re.compile(r'self\.(_post|_read_return|_read_image_return|_stream|_flush)\b')
+
+
+def generate(source):
+    s = source.replace(_HEADER, _HEADER + _GENERATED, 1)
+    s = s.replace('from surrender.surrender_client_base import surrender_client_base;',
+                  'from surrender.async_surrender_client_base import async_surrender_client_base;')
+    s = s.replace('class surrender_client(surrender_client_base):',
+                  'class async_surrender_client(async_surrender_client_base):')
+    for pattern, replacement in _RULES:
+        s = re.sub(pattern, replacement, s)
+    left = _SYNC_CALLS.search(s)
+    if left is not None:
+        line = s.count('\n', 0, left.start()) + 1
+        raise RuntimeError("line {}: unsupported command pattern: {}".format(line, s.splitlines()[line - 1].strip()))
+    return s
+
+
+def main(argv):
+    with open(_SOURCE, encoding='utf-8') as f:
+        code = generate(f.read())
+    if '--check' in argv:
+        with open(_TARGET, encoding='utf-8') as f:
+            if f.read() != code:
+                print("{} is not up to date, run {}".format(_TARGET, argv[0]))
+                return 1
+        return 0
+    with open(_TARGET, 'w', encoding='utf-8') as f:
+        f.write(code)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))